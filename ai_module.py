@@ -1,115 +1,467 @@
-import google.generativeai as genai
-import streamlit as st
-import PIL.Image  # Import the Image processing library
-from io import BytesIO  # Import BytesIO to handle image data
-import base64
+from gemini_client import get_client
+from image_utils import prepare_image  # Downsizes images before upload
+from job_index import get_job_index
+from metrics import get_metrics, inc, record_usage, span, timed
+from model_backends import get_model_registry
+from prompt_budget import compact_resume
+from resume_parser import ResumeSections, sections_text
+from rate_limiter import RateLimitTimeout, aadmit, admit
+from resilience import CircuitOpenError
+from response_cache import get_response_cache, make_key
+from singleflight import FlightAbandoned, SingleFlight
+from topic_index import TopicIndex
+import asyncio
 import json
-import requests
+import threading
 import time
+from collections import namedtuple
+
+# The three resume views produced by a single analyze_resume() call.
+ResumeAnalysis = namedtuple("ResumeAnalysis", ["detailed", "short", "fairness"])
+
+# Completed answers are shared through a pluggable, size-bounded cache keyed
+# on the normalized prompt, model name and generation config.
+_stream_stats = {}
+_stream_stats_lock = threading.Lock()
+
+# Identical requests already in flight (same cache key) wait for that call
+# instead of starting their own.
+_flights = SingleFlight()
+
+# Free-text topic features map near-duplicate topics ("python data structures "
+# vs. "Data structures in Python") onto the first one seen, so they share its
+# prompt and cached answer.
+_topic_indexes = {
+    "mock_interview": TopicIndex(),
+    "trends_and_courses": TopicIndex(),
+    "sdlc_project": TopicIndex(),
+}
+
+
+def _resolve_topic(feature, topic):
+    """Returns the canonical topic for a free-text feature input."""
+    return _topic_indexes[feature].resolve(topic)
+
+
+# Sections each feature needs when it is given a parsed ResumeSections record;
+# features not listed here use every section.
+_FEATURE_SECTIONS = {
+    "short_career_advice": ("summary", "experience", "skills"),
+    "similar_job_descriptions": ("experience", "skills", "projects"),
+}
+
+
+@timed("ai_module.resume_compaction")
+def _resume_for_prompt(resume, feature):
+    """
+    Returns the resume text to interpolate into a feature's prompt.
+
+    Args:
+        resume (str | ResumeSections): Extracted resume text, or the parsed
+            sections, of which only those relevant to the feature are sent.
+        feature (str): The feature building the prompt.
+
+    Returns:
+        str: The text, normalized and trimmed to the prompt token budget.
+    """
+    if isinstance(resume, ResumeSections):
+        resume = sections_text(resume, _FEATURE_SECTIONS.get(feature))
+    return compact_resume(resume)[0]
+
+
+def get_prompt_size_report(resume_text):
+    """
+    Reports how much compaction shrank a resume before it is sent to the model.
+
+    Returns:
+        prompt_budget.CompactionReport: Estimated tokens before and after, and
+            whether sections were cut to fit the budget.
+    """
+    return compact_resume(resume_text)[1]
+
+
+def _model_for(feature, model):
+    """Returns the model a feature is configured to use, or model if it has no override."""
+    registry = get_model_registry()
+    if feature not in registry.feature_models:
+        return model
+    return registry.for_feature(feature)
+
+
+def _cache_key(model, contents, generation_config=None):
+    """Builds the response cache key for a call to the given model."""
+    config = dict(getattr(model, "_generation_config", None) or {})
+    config.update(generation_config or {})
+    return make_key(contents, getattr(model, "model_name", ""), config)
+
+
+def get_response_cache_stats():
+    """
+    Returns response cache statistics.
+
+    Returns:
+        dict: Hits, misses, hit ratio, bytes saved and current cache size.
+    """
+    return get_response_cache().stats()
+
+
+def get_single_flight_stats():
+    """
+    Returns request coalescing statistics.
+
+    Returns:
+        dict: Leader calls, calls that shared an in-flight result, and calls
+            currently in flight.
+    """
+    return _flights.stats()
+
+
+def get_resilience_stats():
+    """
+    Returns how often each retry, deadline and circuit-breaker path has fired.
+
+    Returns:
+        dict: Counters for calls, successes, retries, honored retry hints,
+            deadline overruns, circuit openings and short-circuited calls.
+    """
+    return get_client().resilience.stats()
+
+
+def _record_cache_lookup(feature, cached):
+    inc("cache_requests_total", cache="response", feature=feature,
+        result="miss" if cached is None else "hit")
+
+
+def _record_stream(feature, ttft):
+    get_metrics().observe("model.ttft", ttft, feature=feature)
+    with _stream_stats_lock:
+        stats = _stream_stats.setdefault(feature, {"streams": 0, "total_ttft": 0.0, "last_ttft": None})
+        stats["streams"] += 1
+        stats["total_ttft"] += ttft
+        stats["last_ttft"] = ttft
+
+
+def get_stream_stats():
+    """
+    Returns time-to-first-token statistics for each streamed feature.
+
+    Returns:
+        dict: Per-feature stream count, mean and last time-to-first-token in seconds.
+    """
+    with _stream_stats_lock:
+        return {
+            feature: {
+                "streams": stats["streams"],
+                "mean_ttft": stats["total_ttft"] / stats["streams"],
+                "last_ttft": stats["last_ttft"],
+            }
+            for feature, stats in _stream_stats.items()
+        }
+
+
+class ResponseStream:
+    """
+    An iterable of text chunks from a streaming model call.
+
+    Once iteration finishes, `text` holds the completed answer and `ttft` the
+    time-to-first-token in seconds (None when served from the cache).
+    """
+
+    def __init__(self, model, feature, contents):
+        model = _model_for(feature, model)
+        self._model = model
+        self._feature = feature
+        self._contents = contents
+        self._key = _cache_key(model, contents)
+        self.text = None
+        self.ttft = None
+
+    def __iter__(self):
+        cache = get_response_cache()
+        cached = cache.get(self._feature, self._key)
+        _record_cache_lookup(self._feature, cached)
+        if cached is not None:
+            self.text = cached
+            yield cached
+            return
+
+        future, leader = _flights.begin(self._key)
+        if not leader:
+            # The same request is already being generated; wait for its answer.
+            try:
+                self.text = future.result()
+            except FlightAbandoned:
+                pass
+            else:
+                yield self.text
+                return
+
+        try:
+            yield from self._stream(cache)
+        except BaseException as exc:
+            if leader:
+                # A closed generator means the reader went away, not that the call failed.
+                _flights.fail(self._key, FlightAbandoned() if isinstance(exc, GeneratorExit) else exc)
+            raise
+        if leader:
+            _flights.finish(self._key, self.text)
+
+    def _stream(self, cache):
+        start = time.perf_counter()
+        admit(self._feature, self._contents)
+        parts = []
+        chunk = None
+        with span("model.stream", feature=self._feature):
+            for chunk in get_client().stream(self._model, self._contents):
+                if self.ttft is None:
+                    self.ttft = time.perf_counter() - start
+                    _record_stream(self._feature, self.ttft)
+                parts.append(chunk.text)
+                yield chunk.text
+
+        # Only reached when the stream ran to completion; the last chunk
+        # carries the usage totals.
+        record_usage(self._feature, chunk)
+        self.text = "".join(parts)
+        cache.set(self._feature, self._key, self.text)
+
+
+def _generate_text(model, feature, contents, generation_config=None):
+    """Generates a complete answer, served from the response cache when possible."""
+    with span("ai_module.request", feature=feature):
+        model = _model_for(feature, model)
+        cache = get_response_cache()
+        key = _cache_key(model, contents, generation_config)
+        cached = cache.get(feature, key)
+        _record_cache_lookup(feature, cached)
+        if cached is not None:
+            return cached
+        try:
+            return _flights.do(key, _generate_uncached, model, feature, contents, generation_config, key)
+        except FlightAbandoned:
+            # The stream we were waiting on was abandoned; make the call ourselves.
+            return _generate_uncached(model, feature, contents, generation_config, key)
+
+
+def _generate_uncached(model, feature, contents, generation_config, key):
+    # Only cache misses spend quota, so only they wait for the rate limiter.
+    admit(feature, contents)
+    with span("model.call", feature=feature):
+        if generation_config:
+            response = get_client().generate(model, contents, generation_config=generation_config)
+        else:
+            response = get_client().generate(model, contents)
+    record_usage(feature, response)
+    get_response_cache().set(feature, key, response.text)
+    return response.text
+
+
+async def _agenerate_text(model, feature, contents, generation_config=None):
+    """Async counterpart of _generate_text, for use from an event loop."""
+    with span("ai_module.request", feature=feature):
+        model = _model_for(feature, model)
+        cache = get_response_cache()
+        key = _cache_key(model, contents, generation_config)
+        cached = cache.get(feature, key)
+        _record_cache_lookup(feature, cached)
+        if cached is not None:
+            return cached
+        try:
+            return await _flights.ado(key, _agenerate_uncached, model, feature, contents, generation_config, key)
+        except FlightAbandoned:
+            return await _agenerate_uncached(model, feature, contents, generation_config, key)
+
+
+async def _agenerate_uncached(model, feature, contents, generation_config, key):
+    await aadmit(feature, contents)
+    with span("model.call", feature=feature):
+        if generation_config:
+            response = await get_client().agenerate(model, contents, generation_config=generation_config)
+        else:
+            response = await get_client().agenerate(model, contents)
+    record_usage(feature, response)
+    get_response_cache().set(feature, key, response.text)
+    return response.text
+
 
 def setup_model(api_key):
     """
-    Configures the Gemini API with the provided key and initializes the
-    GenerativeModel.
+    Configures the model backend with the provided key and initializes the
+    model.
+
+    The backend is chosen with CAREERCRAFT_MODEL_BACKEND: "gemini" (the
+    default) or "fake", a deterministic offline stand-in for benchmarks and
+    tests. Models come from the process-wide registry, so only the first call
+    creates them; later calls (e.g. Streamlit reruns) return the same objects.
+    Features with a model override in CAREERCRAFT_FEATURE_MODELS get their
+    model from the registry as well.
 
     Args:
-        api_key (str): The Gemini API key.
-    
+        api_key (str): The Gemini API key. Not needed by the fake backend.
+
     Returns:
-        genai.GenerativeModel: The initialized Gemini model.
+        genai.GenerativeModel: The default model (CAREERCRAFT_MODEL), or a FakeModel.
     """
-    genai.configure(api_key=api_key)
-    # Using 'gemini-1.5-flash-latest' as a reliable and widely available model.
-    return genai.GenerativeModel('gemini-1.5-flash-latest') 
+    registry = get_model_registry()
+    registry.configure(api_key)
+    registry.warm_up()
+    return registry.get()
+
+@timed("ai_module.prompt_build", prompt="career_advice")
+def _career_advice_prompt(resume_text):
+    resume_text = _resume_for_prompt(resume_text, "career_advice")
+    prompt = f"""
+    Based on this resume:
+    {resume_text}
+
+    1. Suggest 3 ideal career paths.
+    2. Identify missing or weak skills.
+    3. Recommend improvement areas.
+    """
+    return prompt
 
-@st.cache_data
 def get_career_advice(_model, resume_text):
     """
     Generates detailed career advice based on the provided resume text using the model.
-    
+
     Args:
         _model (genai.GenerativeModel): The initialized Gemini model.
-        resume_text (str): The text extracted from the user's resume.
+        resume_text (str | ResumeSections): The text extracted from the user's resume,
+            or its parsed sections.
 
     Returns:
         str: The generated career advice.
     """
+    return _generate_text(_model, "career_advice", _career_advice_prompt(resume_text))
+
+def stream_career_advice(_model, resume_text):
+    """
+    Streams detailed career advice chunk by chunk.
+
+    Returns:
+        ResponseStream: An iterable of text chunks.
+    """
+    return ResponseStream(_model, "career_advice", _career_advice_prompt(resume_text))
+
+@timed("ai_module.prompt_build", prompt="short_career_advice")
+def _short_career_advice_prompt(resume_text):
+    resume_text = _resume_for_prompt(resume_text, "short_career_advice")
     prompt = f"""
     Based on this resume:
     {resume_text}
 
-    1. Suggest 3 ideal career paths.
-    2. Identify missing or weak skills.
-    3. Recommend improvement areas.
+    Provide a brief summary (in 2-3 sentences) of:
+    1. The most suitable career path.
+    2. The single most important skill to improve.
     """
-    response = _model.generate_content(prompt)
-    return response.text
+    return prompt
 
-@st.cache_data
 def get_short_career_advice(_model, resume_text):
     """
     Generates a brief summary of career advice.
     """
+    return _generate_text(_model, "short_career_advice", _short_career_advice_prompt(resume_text))
+
+def stream_short_career_advice(_model, resume_text):
+    """
+    Streams a brief summary of career advice.
+    """
+    return ResponseStream(_model, "short_career_advice", _short_career_advice_prompt(resume_text))
+
+@timed("ai_module.prompt_build", prompt="mock_interview")
+def _mock_interview_prompt(user_input):
     prompt = f"""
-    Based on this resume, provide a brief summary (in 2-3 sentences) of:
-    1. The most suitable career path.
-    2. The single most important skill to improve.
+    Pretend you're an interviewer. Ask a technical question about '{user_input}' and provide an ideal answer.
     """
-    response = _model.generate_content(prompt)
-    return response.text
+    return prompt
 
-@st.cache_data
 def mock_interview(_model, user_input):
     """
     Generates a mock interview question and an ideal answer based on a given topic.
     """
+    topic = _resolve_topic("mock_interview", user_input)
+    return _generate_text(_model, "mock_interview", _mock_interview_prompt(topic))
+
+def stream_mock_interview(_model, user_input):
+    """
+    Streams a mock interview question and an ideal answer.
+    """
+    topic = _resolve_topic("mock_interview", user_input)
+    return ResponseStream(_model, "mock_interview", _mock_interview_prompt(topic))
+
+@timed("ai_module.prompt_build", prompt="trends_and_courses")
+def _trends_and_courses_prompt(interest_area):
     prompt = f"""
-    Pretend you're an interviewer. Ask a technical question about '{user_input}' and provide an ideal answer.
+    What are current industry trends and top courses for {interest_area}?
     """
-    response = _model.generate_content(prompt)
-    return response.text
+    return prompt
 
-@st.cache_data
 def get_trends_and_courses(_model, interest_area):
     """
     Generates current industry trends and top courses for a given area.
     """
-    prompt = f"""
-    What are current industry trends and top courses for {interest_area}?
+    topic = _resolve_topic("trends_and_courses", interest_area)
+    return _generate_text(_model, "trends_and_courses", _trends_and_courses_prompt(topic))
+
+def stream_trends_and_courses(_model, interest_area):
     """
-    response = _model.generate_content(prompt)
-    return response.text
+    Streams current industry trends and top courses for a given area.
+    """
+    topic = _resolve_topic("trends_and_courses", interest_area)
+    return ResponseStream(_model, "trends_and_courses", _trends_and_courses_prompt(topic))
+
+@timed("ai_module.match_job_descriptions")
+def match_job_descriptions(resume_text, k=3):
+    """
+    Finds the job descriptions in the local corpus closest to a resume.
+
+    Args:
+        resume_text (str | ResumeSections): The resume text or its parsed sections.
+        k (int): Number of matches to return.
+
+    Returns:
+        list: JobMatch records, best first.
+    """
+    query = _resume_for_prompt(resume_text, "similar_job_descriptions")
+    return get_job_index().query([query], k)[0]
+
+def _format_job_match(rank, match):
+    return f"### {rank}. {match.title}\n*Similarity: {match.score:.2f}*\n\n{match.description}"
 
-@st.cache_data
 def find_similar_job_descriptions(_model, resume_text):
     """
-    Simulates finding similar job descriptions using a prompt that acts like vector search.
-    This demonstrates the concept without needing a full vector database.
+    Finds the 3 job descriptions most similar to a resume with a local vector search.
+
+    No model call is made; _model is accepted so callers are unchanged.
+
+    Returns:
+        str: The matching job descriptions, formatted as Markdown.
     """
-    prompt = f"""
-    Given the following resume, generate 3 hypothetical job descriptions that have similar skills and requirements.
-    This is a demonstration of how a vector search might work to find matching jobs.
+    return "".join(stream_similar_job_descriptions(_model, resume_text)).strip()
 
-    Resume:
-    {resume_text}
+def stream_similar_job_descriptions(_model, resume_text):
     """
-    response = _model.generate_content(prompt)
-    return response.text
+    Yields the similar job descriptions one match at a time.
+    """
+    for rank, match in enumerate(match_job_descriptions(resume_text), start=1):
+        yield _format_job_match(rank, match) + "\n\n"
 
-@st.cache_data
 def create_image_caption(_model, image_bytes, prompt="Caption this image."):
     """
     Generates a caption for an uploaded image using a multimodal model.
     """
-    img = PIL.Image.open(BytesIO(image_bytes))
-    response = _model.generate_content([prompt, img])
-    return response.text
+    img = prepare_image(image_bytes)
+    return _generate_text(_model, "image_caption", [prompt, img])
 
-@st.cache_data
-def plan_sdlc_project(_model, project_idea):
+def stream_image_caption(_model, image_bytes, prompt="Caption this image."):
     """
-    Helps plan an end-to-end software development project.
+    Streams a caption for an uploaded image.
     """
+    img = prepare_image(image_bytes)
+    return ResponseStream(_model, "image_caption", [prompt, img])
+
+@timed("ai_module.prompt_build", prompt="sdlc_project")
+def _sdlc_project_prompt(project_idea):
     prompt = f"""
     You are an expert DevOps and Application Developer.
     Based on this project idea: '{project_idea}', provide a detailed plan for the end-to-end Software Development Life Cycle (SDLC).
@@ -120,16 +472,24 @@ def plan_sdlc_project(_model, project_idea):
     4. An initial code structure or a code snippet for a core component.
     5. A simple test plan for the application.
     """
-    response = _model.generate_content(prompt)
-    return response.text
+    return prompt
 
-@st.cache_data
-def get_multimodal_career_advice(_model, resume_text, resume_images):
+def plan_sdlc_project(_model, project_idea):
     """
-    Generates detailed career advice based on the provided resume's text and images.
-    
-    This implements the "Inspect Rich Documents with Gemini Multimodality" badge.
+    Helps plan an end-to-end software development project.
     """
+    topic = _resolve_topic("sdlc_project", project_idea)
+    return _generate_text(_model, "sdlc_project", _sdlc_project_prompt(topic))
+
+def stream_sdlc_project_plan(_model, project_idea):
+    """
+    Streams an end-to-end software development project plan.
+    """
+    topic = _resolve_topic("sdlc_project", project_idea)
+    return ResponseStream(_model, "sdlc_project", _sdlc_project_prompt(topic))
+
+@timed("ai_module.prompt_build", prompt="multimodal_career_advice")
+def _multimodal_career_advice_parts(resume_text, resume_images):
     prompt_parts = [
         f"""
         Based on this resume, which includes both text and images, charts, and tables,
@@ -140,22 +500,31 @@ def get_multimodal_career_advice(_model, resume_text, resume_images):
         3. Recommend improvement areas, referencing specific data from the resume where appropriate.
         """
     ]
-    
+
     # Add image parts to the prompt_parts list
     for img_bytes in resume_images:
-        img = PIL.Image.open(BytesIO(img_bytes))
-        prompt_parts.append(img)
-        
-    response = _model.generate_content(prompt_parts)
-    return response.text
+        prompt_parts.append(prepare_image(img_bytes))
+    return prompt_parts
 
-@st.cache_data
-def get_interpretable_and_fair_advice(_model, resume_text):
+def get_multimodal_career_advice(_model, resume_text, resume_images):
     """
-    Generates career advice with an explanation and a fairness check.
-    
-    This implements the "Interpretability & Transparency" and "Fairness & Bias" badges.
+    Generates detailed career advice based on the provided resume's text and images.
+
+    This implements the "Inspect Rich Documents with Gemini Multimodality" badge.
+    """
+    prompt_parts = _multimodal_career_advice_parts(resume_text, resume_images)
+    return _generate_text(_model, "multimodal_career_advice", prompt_parts)
+
+def stream_multimodal_career_advice(_model, resume_text, resume_images):
+    """
+    Streams detailed career advice based on the resume's text and images.
     """
+    prompt_parts = _multimodal_career_advice_parts(resume_text, resume_images)
+    return ResponseStream(_model, "multimodal_career_advice", prompt_parts)
+
+@timed("ai_module.prompt_build", prompt="interpretable_and_fair_advice")
+def _interpretable_and_fair_advice_prompt(resume_text):
+    resume_text = _resume_for_prompt(resume_text, "interpretable_and_fair_advice")
     prompt = f"""
     Based on the following resume:
     {resume_text}
@@ -168,21 +537,154 @@ def get_interpretable_and_fair_advice(_model, resume_text):
     
     3.  **Fairness Check**: Analyze your own advice for potential biases. Specifically, comment on whether the advice is fair and inclusive, and if it avoids making assumptions based on gender, age, or background.
     """
-    response = _model.generate_content(prompt)
-    return response.text
+    return prompt
 
-@st.cache_data
+def get_interpretable_and_fair_advice(_model, resume_text):
+    """
+    Generates career advice with an explanation and a fairness check.
+
+    This implements the "Interpretability & Transparency" and "Fairness & Bias" badges.
+    """
+    return _generate_text(_model, "interpretable_and_fair_advice", _interpretable_and_fair_advice_prompt(resume_text))
+
+def stream_interpretable_and_fair_advice(_model, resume_text):
+    """
+    Streams career advice with an explanation and a fairness check.
+    """
+    return ResponseStream(_model, "interpretable_and_fair_advice", _interpretable_and_fair_advice_prompt(resume_text))
+
+@timed("ai_module.prompt_build", prompt="resume_analysis")
+def _resume_analysis_prompt(resume_text):
+    resume_text = _resume_for_prompt(resume_text, "resume_analysis")
+    prompt = f"""
+    Based on this resume:
+    {resume_text}
+
+    Respond with a single JSON object containing exactly these three string fields, each written in Markdown:
+
+    "detailed": 1. Suggest 3 ideal career paths. 2. Identify missing or weak skills. 3. Recommend improvement areas.
+
+    "short": A brief summary (in 2-3 sentences) of the most suitable career path and the single most important skill to improve.
+
+    "fairness": A detailed career analysis that includes:
+    1.  **Career Advice**: Suggest 3 ideal career paths, identify missing skills, and recommend improvement areas.
+    2.  **Reasoning**: Explain the specific reasons for your advice, referencing skills or experiences in the resume that led to each recommendation.
+    3.  **Fairness Check**: Analyze your own advice for potential biases. Specifically, comment on whether the advice is fair and inclusive, and if it avoids making assumptions based on gender, age, or background.
+    """
+    return prompt
+
+def _parse_resume_analysis(text):
+    """
+    Parses the JSON answer of analyze_resume() into a ResumeAnalysis.
+
+    If the model did not return valid JSON, the raw answer is kept as the
+    detailed view and the other views are left empty.
+    """
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return ResumeAnalysis(detailed=text, short="", fairness="")
+    if not isinstance(data, dict):
+        return ResumeAnalysis(detailed=text, short="", fairness="")
+    return ResumeAnalysis(
+        detailed=str(data.get("detailed") or ""),
+        short=str(data.get("short") or ""),
+        fairness=str(data.get("fairness") or ""),
+    )
+
+def analyze_resume(_model, resume_text):
+    """
+    Generates the detailed, short and fairness-checked views of a resume in one call.
+
+    Asking for all three views in a single JSON response means the resume is
+    uploaded once, and switching between views needs no further API calls.
+
+    Args:
+        _model (genai.GenerativeModel): The initialized Gemini model.
+        resume_text (str | ResumeSections): The text extracted from the user's resume,
+            or its parsed sections.
+
+    Returns:
+        ResumeAnalysis: The detailed, short and fairness views. A view is an
+            empty string if the model's answer could not be parsed.
+    """
+    text = _generate_text(
+        _model,
+        "resume_analysis",
+        _resume_analysis_prompt(resume_text),
+        generation_config={"response_mime_type": "application/json"},
+    )
+    return _parse_resume_analysis(text)
+
+# --- Async Entry Points ---
+# Each coroutine mirrors the synchronous function of the same name.
+
+async def get_career_advice_async(_model, resume_text):
+    return await _agenerate_text(_model, "career_advice", _career_advice_prompt(resume_text))
+
+async def get_short_career_advice_async(_model, resume_text):
+    return await _agenerate_text(_model, "short_career_advice", _short_career_advice_prompt(resume_text))
+
+async def mock_interview_async(_model, user_input):
+    topic = _resolve_topic("mock_interview", user_input)
+    return await _agenerate_text(_model, "mock_interview", _mock_interview_prompt(topic))
+
+async def get_trends_and_courses_async(_model, interest_area):
+    topic = _resolve_topic("trends_and_courses", interest_area)
+    return await _agenerate_text(_model, "trends_and_courses", _trends_and_courses_prompt(topic))
+
+async def find_similar_job_descriptions_async(_model, resume_text):
+    return await asyncio.to_thread(find_similar_job_descriptions, _model, resume_text)
+
+async def create_image_caption_async(_model, image_bytes, prompt="Caption this image."):
+    img = await asyncio.to_thread(prepare_image, image_bytes)
+    return await _agenerate_text(_model, "image_caption", [prompt, img])
+
+async def plan_sdlc_project_async(_model, project_idea):
+    topic = _resolve_topic("sdlc_project", project_idea)
+    return await _agenerate_text(_model, "sdlc_project", _sdlc_project_prompt(topic))
+
+async def get_multimodal_career_advice_async(_model, resume_text, resume_images):
+    prompt_parts = await asyncio.to_thread(_multimodal_career_advice_parts, resume_text, resume_images)
+    return await _agenerate_text(_model, "multimodal_career_advice", prompt_parts)
+
+async def get_interpretable_and_fair_advice_async(_model, resume_text):
+    return await _agenerate_text(_model, "interpretable_and_fair_advice", _interpretable_and_fair_advice_prompt(resume_text))
+
+async def analyze_resume_async(_model, resume_text):
+    text = await _agenerate_text(
+        _model,
+        "resume_analysis",
+        _resume_analysis_prompt(resume_text),
+        generation_config={"response_mime_type": "application/json"},
+    )
+    return _parse_resume_analysis(text)
+
+async def generate_image_from_prompt_async(_prompt):
+    return await asyncio.to_thread(generate_image_from_prompt, _prompt)
+
+@timed("ai_module.generate_image_from_prompt")
 def generate_image_from_prompt(_prompt):
     """
     Generates an image from a text prompt using the gemini-2.0-flash-preview-image-generation model.
 
     This implements the "Introduction to Image Generation" badge.
     """
-    import base64
-    import json
+    cache = get_response_cache()
+    key = make_key(_prompt, "gemini-2.0-flash-preview-image-generation")
+    cached = cache.get("image_generation", key)
+    _record_cache_lookup("image_generation", cached)
+    if cached is not None:
+        return cached
+    image_url = _generate_image(_prompt)
+    if image_url is not None:
+        cache.set("image_generation", key, image_url)
+    return image_url
+
+def _generate_image(_prompt):
+    # Loaded with the pooled HTTP session by get_client(); only needed for the except clause.
     import requests
-    import time
-    
+
     payload = {
         "contents": [{
             "parts": [{ "text": _prompt }]
@@ -191,31 +693,24 @@ def generate_image_from_prompt(_prompt):
             "responseModalities": ["TEXT", "IMAGE"]
         },
     }
-    
+
     api_key = "" # Leave this as an empty string.
     apiUrl = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-preview-image-generation:generateContent?key={api_key}"
-    
-    # The fetch call with exponential backoff
-    retries = 0
-    max_retries = 5
-    while retries < max_retries:
-        try:
-            response = requests.post(apiUrl, headers={'Content-Type': 'application/json'}, data=json.dumps(payload))
-            response.raise_for_status() # Raise an exception for bad status codes
-            result = response.json()
-            if result.get("candidates") and len(result["candidates"]) > 0:
-                parts = result["candidates"][0]["content"]["parts"]
-                for part in parts:
-                    if "inlineData" in part:
-                        base64_data = part["inlineData"]["data"]
-                        # Create a data URL to display the image
-                        return f"data:image/png;base64,{base64_data}"
-                return None
-            else:
-                return None
-        except requests.exceptions.RequestException as e:
-            retries += 1
-            delay = 2**retries  # Exponential backoff
-            time.sleep(delay)
-    
+
+    # Retries, backoff and the request deadline are handled by the client.
+    try:
+        admit("image_generation", _prompt)
+        # Reuse the pooled keep-alive session instead of a new connection per attempt.
+        response = get_client().post_json(apiUrl, payload)
+        result = response.json()
+    except (requests.exceptions.RequestException, CircuitOpenError, RateLimitTimeout, ValueError):
+        return None
+
+    if result.get("candidates") and len(result["candidates"]) > 0:
+        parts = result["candidates"][0]["content"]["parts"]
+        for part in parts:
+            if "inlineData" in part:
+                base64_data = part["inlineData"]["data"]
+                # Create a data URL to display the image
+                return f"data:image/png;base64,{base64_data}"
     return None
@@ -2,8 +2,13 @@ import streamlit as st
 import os
 import google.api_core.exceptions
 import ai_module
-from resume_parser import extract_text_and_images_from_pdf
-from utils import is_safe
+from resume_parser import extract_text_and_images_from_pdf, parse_resume_sections
+from utils import UnsafeContentError, checked_stream, get_safety_filter, is_safe
+from resilience import CircuitOpenError
+from rate_limiter import RateLimitTimeout
+import jobs
+from metrics import inc, span
+from model_backends import get_backend
 import base64
 from io import BytesIO
 
@@ -201,14 +206,57 @@ st.markdown("""
 # Use an environment variable for the API key instead of a text input
 api_key = os.getenv("GEMINI_API_KEY")
 
-if not api_key:
+if not api_key and get_backend().requires_api_key:
     st.error("API key not found. Please set the GEMINI_API_KEY environment variable.")
     st.info("Example for Windows: `setx GEMINI_API_KEY \"YOUR_KEY_HERE\"`")
     st.info("Example for Mac/Linux: `export GEMINI_API_KEY=\"YOUR_KEY_HERE\"`")
     st.stop()
 
 
+# Models are created on the first run in this process and reused on every rerun.
 model = ai_module.setup_model(api_key)
+job_queue = jobs.get_job_queue()
+
+
+def render_streamed_response(stream, show_heading):
+    """
+    Renders a model response chunk by chunk as it is generated.
+
+    Each chunk passes the safety filter before it is shown, and streaming
+    stops at the first banned word.
+
+    Args:
+        stream (ai_module.ResponseStream): The streamed response.
+        show_heading (callable): Renders the heading shown above the response.
+
+    Returns:
+        bool: True if the completed response passed the safety check.
+    """
+    scanner = get_safety_filter().scanner()
+
+    def checked_chunks():
+        for chunk in stream:
+            with span("app.is_safe"):
+                safe = scanner.feed(chunk)
+            if not safe:
+                return
+            yield chunk
+
+    placeholder = st.empty()
+    with span("app.render_stream"), placeholder.container():
+        show_heading()
+        st.write_stream(checked_chunks())
+        if stream.ttft is not None:
+            st.caption(f"First token in {stream.ttft:.2f}s")
+
+    if not scanner.finish():
+        placeholder.error("Inappropriate content detected in the response. Try with a different input.")
+        return False
+    return True
+
+
+# Each interactive section below is a fragment: using its widgets reruns only
+# that section, not the styling, header, model setup or the other sections.
 
 # --- About Section ---
 st.markdown("<div id='about-section'></div>", unsafe_allow_html=True)
@@ -240,83 +288,143 @@ st.markdown("<div id='career-guidance-section'></div>", unsafe_allow_html=True)
 st.markdown("---")
 st.header("📄 Career-Based Guidance")
 st.markdown("Upload your resume and get tailored advice on career paths and skill development.")
-uploaded_file = st.file_uploader("Upload your resume (PDF only)", type=['pdf'])
-
-# Add a checkbox for the new responsible AI feature
-use_responsible_ai = st.checkbox("Enable Responsible AI Features (Interpretability & Bias Check)")
-
-if uploaded_file:
-    # Use the new function to get both text and images
-    resume_text, resume_images = extract_text_and_images_from_pdf(uploaded_file)
 
-    st.info("Resume Preview:")
-    st.text_area("Extracted Text:", resume_text, height=200)
-
-    advice_type = st.radio("Choose advice length:", ("Detailed", "Short"))
-
-    if st.button("Get Career Guidance"):
-        with st.spinner("Generating personalized advice..."):
-            try:
-                # Conditionally call the appropriate function based on the checkbox
-                if use_responsible_ai:
-                    advice = ai_module.get_interpretable_and_fair_advice(model, resume_text)
-                elif advice_type == "Detailed":
-                    advice = ai_module.get_career_advice(model, resume_text)
-                else:
-                    advice = ai_module.get_short_career_advice(model, resume_text)
-
-                if is_safe(advice):
-                    st.success("🎓 Career Advice")
-                    st.write(advice)
+@st.fragment
+def career_guidance_section():
+    """Resume upload, parsing and career advice."""
+    uploaded_file = st.file_uploader("Upload your resume (PDF only)", type=['pdf'])
+
+    # Add a checkbox for the new responsible AI feature
+    use_responsible_ai = st.checkbox("Enable Responsible AI Features (Interpretability & Bias Check)")
+
+    if uploaded_file:
+        st.info("Resume Preview:")
+        preview = st.empty()
+        parsed_pages = []
+
+        def show_parsed_page(page):
+            # Render pages as they are parsed so long documents don't block the preview.
+            parsed_pages.append(page.text)
+            preview.text(f"Parsing page {page.number + 1} of {page.page_count}...\n\n" + "".join(parsed_pages))
+
+        # Use the new function to get both text and images
+        resume_text, resume_images = extract_text_and_images_from_pdf(uploaded_file, on_page=show_parsed_page)
+
+        with preview.container():
+            st.text_area("Extracted Text:", resume_text, height=200)
+
+        resume_sections = parse_resume_sections(uploaded_file)
+        if resume_sections.skills_set:
+            st.caption("Detected skills: " + ", ".join(sorted(resume_sections.skills_set)))
+        # Matched locally against the job corpus, so this costs no model call.
+        with st.expander("🔎 Similar job descriptions"):
+            st.markdown(ai_module.find_similar_job_descriptions(model, resume_sections))
+
+        advice_type = st.radio("Choose advice length:", ("Detailed", "Short"))
+
+        if st.button("Get Career Guidance"):
+            with st.spinner("Generating personalized advice..."):
+                try:
+                    # One call produces every view, so the toggles below never call the model again.
+                    analysis = ai_module.analyze_resume(model, resume_text)
+                    st.session_state.resume_analysis = (resume_text, analysis)
                     st.session_state.resume_count += 1
+                    # resume_count is per session; this counter covers the whole process.
+                    inc("resumes_analyzed_total")
+                except google.api_core.exceptions.ResourceExhausted:
+                    st.error("You've exceeded your API quota. Please try again in a few minutes.")
+                except CircuitOpenError as e:
+                    st.error(str(e))
+                except RateLimitTimeout:
+                    st.error("The service is busy right now. Please try again in a minute.")
+                except Exception as e:
+                    st.error(f"An unexpected error occurred: {e}")
                 else:
-                    st.error("Inappropriate content detected in the response. Try with a different input.")
-            except google.api_core.exceptions.ResourceExhausted:
-                st.error("You've exceeded your API quota. Please try again in a few minutes.")
-            except Exception as e:
-                st.error(f"An unexpected error occurred: {e}")
+                    # The "Resumes Analyzed" metric is outside this fragment; rerun the
+                    # page once to update it. The parsed resume and the analysis are cached.
+                    st.rerun()
+
+        stored_analysis = st.session_state.get("resume_analysis")
+        if stored_analysis and stored_analysis[0] == resume_text:
+            analysis = stored_analysis[1]
+            # Conditionally show the appropriate view based on the checkbox
+            if use_responsible_ai:
+                advice = analysis.fairness
+            elif advice_type == "Detailed":
+                advice = analysis.detailed
+            else:
+                advice = analysis.short
+
+            if not advice:
+                st.warning("This view could not be generated. Please try again.")
+            elif is_safe(advice):
+                st.success("🎓 Career Advice")
+                st.write(advice)
+                report = ai_module.get_prompt_size_report(resume_text)
+                st.caption(
+                    f"Resume sent as ~{report.compacted_tokens:,} tokens "
+                    f"(~{report.original_tokens:,} before compaction"
+                    f"{', trimmed to fit' if report.truncated else ''})."
+                )
+            else:
+                st.error("Inappropriate content detected in the response. Try with a different input.")
+
+
+career_guidance_section()
 
 # --- Mock Interview Section ---
 st.markdown("<div id='mock-interview-section'></div>", unsafe_allow_html=True)
 st.markdown("---")
 st.header("🗣️ Mock Interview Practice")
 st.markdown("Practice for your next interview by generating questions based on any topic.")
-interview_topic = st.text_input("Enter a topic (e.g., 'Python data structures', 'Cloud computing'):")
-if st.button("Start Mock Interview"):
-    if interview_topic:
-        with st.spinner(f"Generating a question on '{interview_topic}'..."):
-            try:
-                interview_response = ai_module.mock_interview(model, interview_topic)
-                if is_safe(interview_response):
-                    st.info("Here is your mock interview question and an ideal answer:")
-                    st.write(interview_response)
-                else:
-                    st.error("Inappropriate content detected.")
-            except Exception as e:
-                st.error(f"An error occurred: {e}")
-    else:
-        st.warning("Please enter a topic to start the interview.")
+
+@st.fragment
+def mock_interview_section():
+    """Mock interview questions for a topic."""
+    interview_topic = st.text_input("Enter a topic (e.g., 'Python data structures', 'Cloud computing'):")
+    if st.button("Start Mock Interview"):
+        if interview_topic:
+            with st.spinner(f"Generating a question on '{interview_topic}'..."):
+                try:
+                    interview_response = ai_module.stream_mock_interview(model, interview_topic)
+                    render_streamed_response(
+                        interview_response,
+                        lambda: st.info("Here is your mock interview question and an ideal answer:"),
+                    )
+                except Exception as e:
+                    st.error(f"An error occurred: {e}")
+        else:
+            st.warning("Please enter a topic to start the interview.")
+
+
+mock_interview_section()
 
 # --- Industry Trends & Courses Section ---
 st.markdown("<div id='trends-section'></div>", unsafe_allow_html=True)
 st.markdown("---")
 st.header("📈 Industry Trends & Courses")
 st.markdown("Discover the latest trends and get course suggestions in your area of interest.")
-interest_area = st.text_input("Enter an area of interest (e.g., 'Generative AI', 'Cybersecurity'):")
-if st.button("Get Trends & Courses"):
-    if interest_area:
-        with st.spinner(f"Searching for trends in '{interest_area}'..."):
-            try:
-                trends_response = ai_module.get_trends_and_courses(model, interest_area)
-                if is_safe(trends_response):
-                    st.info("Here are the latest trends and course suggestions:")
-                    st.write(trends_response)
-                else:
-                    st.error("Inappropriate content detected.")
-            except Exception as e:
-                st.error(f"An unexpected error occurred: {e}")
-    else:
-        st.warning("Please enter an area of interest.")
+
+@st.fragment
+def trends_section():
+    """Industry trends and course suggestions."""
+    interest_area = st.text_input("Enter an area of interest (e.g., 'Generative AI', 'Cybersecurity'):")
+    if st.button("Get Trends & Courses"):
+        if interest_area:
+            with st.spinner(f"Searching for trends in '{interest_area}'..."):
+                try:
+                    trends_response = ai_module.stream_trends_and_courses(model, interest_area)
+                    render_streamed_response(
+                        trends_response,
+                        lambda: st.info("Here are the latest trends and course suggestions:"),
+                    )
+                except Exception as e:
+                    st.error(f"An unexpected error occurred: {e}")
+        else:
+            st.warning("Please enter an area of interest.")
+
+
+trends_section()
 
 # --- Image Captioning Section ---
 st.markdown("<div id='image-captioning-section'></div>", unsafe_allow_html=True)
@@ -324,21 +432,23 @@ st.markdown("---")
 st.header("📸 Image Captioning")
 st.markdown("Upload an image and let AI describe it for you.")
 
-uploaded_image = st.file_uploader("Upload an image (JPG, PNG)", type=['jpg', 'jpeg', 'png'])
-if uploaded_image:
-    st.image(uploaded_image, caption="Uploaded Image", width=500)
-    if st.button("Generate Caption"):
-        with st.spinner("Generating caption..."):
-            try:
-                image_bytes = uploaded_image.getvalue()
-                caption = ai_module.create_image_caption(model, image_bytes)
-                if is_safe(caption):
-                    st.success("📝 Image Caption")
-                    st.write(caption)
-                else:
-                    st.error("Inappropriate content detected.")
-            except Exception as e:
-                st.error(f"An error occurred: {e}")
+@st.fragment
+def image_captioning_section():
+    """Image upload and captioning."""
+    uploaded_image = st.file_uploader("Upload an image (JPG, PNG)", type=['jpg', 'jpeg', 'png'])
+    if uploaded_image:
+        st.image(uploaded_image, caption="Uploaded Image", width=500)
+        if st.button("Generate Caption"):
+            with st.spinner("Generating caption..."):
+                try:
+                    image_bytes = uploaded_image.getvalue()
+                    caption = ai_module.stream_image_caption(model, image_bytes)
+                    render_streamed_response(caption, lambda: st.success("📝 Image Caption"))
+                except Exception as e:
+                    st.error(f"An error occurred: {e}")
+
+
+image_captioning_section()
 
 # --- End-to-End SDLC Project Planner Section ---
 st.markdown("<div id='sdlc-section'></div>", unsafe_allow_html=True)
@@ -346,54 +456,94 @@ st.markdown("---")
 st.header("⚙️ End-to-End SDLC Project Planner")
 st.markdown("Get a complete project plan, from requirements to code, for your next idea.")
 
-project_idea = st.text_input("Enter your project idea (e.g., 'a weather forecast app'):")
-
-if st.button("Generate Project Plan"):
-    if project_idea:
-        with st.spinner(f"Generating a plan for '{project_idea}'..."):
-            try:
-                plan = ai_module.plan_sdlc_project(model, project_idea)
-                if is_safe(plan):
-                    st.success("✅ Project Plan Generated")
-                    st.write(plan)
-                else:
-                    st.error("Inappropriate content detected.")
-            except Exception as e:
-                st.error(f"An unexpected error occurred: {e}")
+@st.fragment
+def sdlc_planner_section():
+    """Project idea input; the plan itself is shown by the show_sdlc_plan fragment."""
+    project_idea = st.text_input("Enter your project idea (e.g., 'a weather forecast app'):")
+
+    if st.button("Generate Project Plan"):
+        if project_idea:
+            # Plans take a while, so generate them in the background; the job ID in
+            # session state lets the result survive reruns from other widgets.
+            plan = ai_module.stream_sdlc_project_plan(model, project_idea)
+            # Only text that has passed the safety filter reaches job.partial.
+            st.session_state.sdlc_job_id = job_queue.submit_stream(checked_stream(plan))
+            # Rerun the page so show_sdlc_plan starts polling for the new job.
+            st.rerun()
+        else:
+            st.warning("Please enter a project idea.")
+
+
+sdlc_planner_section()
+
+
+def show_sdlc_plan():
+    """Shows the background plan job, polling while it is still running."""
+    job = job_queue.get(st.session_state.get("sdlc_job_id"))
+    if job is None:
+        return
+    if not job.finished:
+        st.info("Generating your project plan...")
+        if job.partial:
+            st.write(job.partial)
+        return
+    if polling_sdlc_job:
+        # Finished since the last poll: rerun the page once to stop polling.
+        st.rerun()
+
+    if job.state == jobs.FAILED and isinstance(job.error, UnsafeContentError):
+        st.error("Inappropriate content detected.")
+    elif job.state == jobs.FAILED:
+        st.error(f"An unexpected error occurred: {job.error}")
+    elif is_safe(job.result):
+        st.success("✅ Project Plan Generated")
+        st.write(job.result)
     else:
-        st.warning("Please enter a project idea.")
+        st.error("Inappropriate content detected.")
+
+
+sdlc_job = job_queue.get(st.session_state.get("sdlc_job_id"))
+polling_sdlc_job = sdlc_job is not None and not sdlc_job.finished
+st.fragment(run_every=1 if polling_sdlc_job else None)(show_sdlc_plan)()
 
 # --- Feedback Section ---
 st.markdown("<div id='feedback-section'></div>", unsafe_allow_html=True)
 st.markdown("---")
 st.header("💌 Provide Feedback")
 st.markdown("Help us improve the quality of the advice by providing your feedback.")
-with st.form("feedback_form"):
-    st.subheader("Your Feedback")
-    user_name = st.text_input("Your Name (Optional):")
-    feedback = st.text_area("Your feedback on the generated response:")
+
+@st.fragment
+def feedback_section():
+    """Feedback form."""
+    with st.form("feedback_form"):
+        st.subheader("Your Feedback")
+        user_name = st.text_input("Your Name (Optional):")
+        feedback = st.text_area("Your feedback on the generated response:")
     
-    # New star rating system using custom CSS
-    st.markdown("""
-        <div class="star-rating">
-            <input type="radio" id="star5" name="rating" value="5" /><label for="star5" title="5 stars">★</label>
-            <input type="radio" id="star4" name="rating" value="4" /><label for="star4" title="4 stars">★</label>
-            <input type="radio" id="star3" name="rating" value="3" /><label for="star3" title="3 stars">★</label>
-            <input type="radio" id="star2" name="rating" value="2" /><label for="star2" title="2 stars">★</label>
-            <input type="radio" id="star1" name="rating" value="1" /><label for="star1" title="1 star">★</label>
-        </div>
-    """, unsafe_allow_html=True)
+        # New star rating system using custom CSS
+        st.markdown("""
+            <div class="star-rating">
+                <input type="radio" id="star5" name="rating" value="5" /><label for="star5" title="5 stars">★</label>
+                <input type="radio" id="star4" name="rating" value="4" /><label for="star4" title="4 stars">★</label>
+                <input type="radio" id="star3" name="rating" value="3" /><label for="star3" title="3 stars">★</label>
+                <input type="radio" id="star2" name="rating" value="2" /><label for="star2" title="2 stars">★</label>
+                <input type="radio" id="star1" name="rating" value="1" /><label for="star1" title="1 star">★</label>
+            </div>
+        """, unsafe_allow_html=True)
     
-    submit_button = st.form_submit_button("Submit Feedback")
-
-    if submit_button:
-        if feedback:
-            st.success("Thank you for your feedback! It has been submitted.")
-            st.markdown(f"**Name:** {user_name if user_name else 'Anonymous'}")
-            st.markdown("**Rating:** We appreciate your rating!")
-            st.markdown(f"**Feedback:** {feedback}")
-        else:
-            st.warning("Please enter some feedback before submitting.")
+        submit_button = st.form_submit_button("Submit Feedback")
+
+        if submit_button:
+            if feedback:
+                st.success("Thank you for your feedback! It has been submitted.")
+                st.markdown(f"**Name:** {user_name if user_name else 'Anonymous'}")
+                st.markdown("**Rating:** We appreciate your rating!")
+                st.markdown(f"**Feedback:** {feedback}")
+            else:
+                st.warning("Please enter some feedback before submitting.")
+
+
+feedback_section()
 
 
 
@@ -0,0 +1,236 @@
+"""
+Analyzes a directory or archive of PDF resumes without the Streamlit app.
+
+Usage:
+    python batch.py resumes/ --output results.jsonl
+    python batch.py resumes.zip --output results.jsonl --parquet results.parquet
+
+Every finished resume is appended to the output file as one JSON line and
+flushed to disk, and the output doubles as the checkpoint: rerunning the same
+command skips resumes (by content hash) that already have a successful result.
+"""
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+import sys
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+# --- Batch Settings ---
+# Worker processes for PDF extraction.
+BATCH_WORKERS = int(os.getenv("CAREERCRAFT_BATCH_WORKERS", str(os.cpu_count() or 1)))
+# Model analyses in flight at once; the shared rate limiter still applies.
+BATCH_CONCURRENCY = int(os.getenv("CAREERCRAFT_BATCH_CONCURRENCY", "4"))
+
+_TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+
+def iter_resume_files(source):
+    """
+    Yields (name, pdf_bytes) for every PDF in a directory, zip or tar archive.
+
+    Files are read one at a time, so an archive is never held in memory whole.
+    """
+    lower = source.lower()
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for filename in sorted(files):
+                if filename.lower().endswith(".pdf"):
+                    path = os.path.join(root, filename)
+                    with open(path, "rb") as f:
+                        yield os.path.relpath(path, source), f.read()
+    elif lower.endswith(".zip"):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(".pdf"):
+                    yield info.filename, archive.read(info)
+    elif lower.endswith(_TAR_SUFFIXES):
+        with tarfile.open(source) as archive:
+            for member in archive:
+                if member.isfile() and member.name.lower().endswith(".pdf"):
+                    yield member.name, archive.extractfile(member).read()
+    elif lower.endswith(".pdf"):
+        with open(source, "rb") as f:
+            yield os.path.basename(source), f.read()
+    else:
+        raise ValueError(f"Expected a directory, .zip, .tar(.gz) or .pdf file: {source}")
+
+
+def _extract(pdf_bytes):
+    """Process pool entry point: returns the resume text and its sorted skills."""
+    from resume_parser import extract_resume_content, parse_resume_sections
+
+    # Documents are already spread over the pool, so each is parsed inline.
+    text, _ = extract_resume_content(io.BytesIO(pdf_bytes), workers=1)
+    skills = sorted(parse_resume_sections(io.BytesIO(pdf_bytes)).skills_set)
+    return text, skills
+
+
+def load_checkpoint(output_path):
+    """
+    Returns the content hashes already analyzed successfully in output_path.
+
+    A trailing line cut off by a crash is ignored, and will be redone.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") == "ok":
+                done.add(record["id"])
+    return done
+
+
+def _open_output(output_path):
+    out = open(output_path, "a+", encoding="utf-8")
+    # Start on a fresh line if the last run died mid-write.
+    if out.tell() > 0:
+        out.seek(out.tell() - 1)
+        if out.read(1) != "\n":
+            out.write("\n")
+    return out
+
+
+async def _analyze_one(name, digest, pdf_bytes, model, pool, analysis_slots):
+    import ai_module
+
+    started = time.monotonic()
+    record = {"id": digest, "source": name}
+    try:
+        loop = asyncio.get_running_loop()
+        text, skills = await loop.run_in_executor(pool, _extract, pdf_bytes)
+        record["skills"] = skills
+        # Embedding the query and scoring the index would block the loop.
+        matches = await asyncio.to_thread(ai_module.match_job_descriptions, text)
+        record["similar_jobs"] = [match.id for match in matches]
+        async with analysis_slots:
+            analysis = await ai_module.analyze_resume_async(model, text)
+        record["analysis"] = analysis._asdict()
+        record["status"] = "ok"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = round(time.monotonic() - started, 3)
+    return record
+
+
+async def run_batch(source, output_path, model, workers=None, concurrency=None):
+    """
+    Extracts and analyzes every resume in source, appending results to output_path.
+
+    Extraction runs in a process pool, analyses run concurrently on the event
+    loop, and at most workers + concurrency resumes are held in memory at once.
+
+    Args:
+        source (str): A directory, archive or single PDF.
+        output_path (str): The JSON Lines results file, also the checkpoint.
+        model (genai.GenerativeModel): The initialized Gemini model.
+        workers (int, optional): Extraction processes. Defaults to BATCH_WORKERS.
+        concurrency (int, optional): Analyses in flight. Defaults to BATCH_CONCURRENCY.
+
+    Returns:
+        dict: Counts of resumes that succeeded, failed or were skipped.
+    """
+    workers = workers or BATCH_WORKERS
+    concurrency = concurrency or BATCH_CONCURRENCY
+    done = load_checkpoint(output_path)
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+    analysis_slots = asyncio.Semaphore(concurrency)
+    window = asyncio.Semaphore(workers + concurrency)
+    tasks = set()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, _open_output(output_path) as out:
+
+        def write(task):
+            window.release()
+            tasks.discard(task)
+            record = task.result()
+            out.write(json.dumps(record) + "\n")
+            # Flushed per record, so a crash loses at most the resumes in flight.
+            out.flush()
+            os.fsync(out.fileno())
+            counts[record["status"]] += 1
+            print(f"[{record['status']}] {record['source']} ({record['seconds']}s)", file=sys.stderr)
+
+        for name, pdf_bytes in iter_resume_files(source):
+            digest = hashlib.sha256(pdf_bytes).hexdigest()
+            if digest in done:
+                counts["skipped"] += 1
+                continue
+            # Also skips byte-identical copies within this run.
+            done.add(digest)
+            await window.acquire()
+            task = asyncio.create_task(
+                _analyze_one(name, digest, pdf_bytes, model, pool, analysis_slots)
+            )
+            tasks.add(task)
+            task.add_done_callback(write)
+
+        while tasks:
+            await asyncio.wait(set(tasks))
+    return counts
+
+
+def write_parquet(jsonl_path, parquet_path):
+    """Converts the successful results in a JSON Lines file to Parquet."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Parquet output needs pyarrow: pip install pyarrow")
+
+    rows = []
+    with open(jsonl_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") != "ok":
+                continue
+            analysis = record.pop("analysis")
+            record.update({f"analysis_{view}": text for view, text in analysis.items()})
+            rows.append(record)
+    pq.write_table(pa.Table.from_pylist(rows), parquet_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze a batch of PDF resumes.")
+    parser.add_argument("source", help="Directory, .zip or .tar(.gz) archive of PDF resumes.")
+    parser.add_argument("--output", "-o", default="results.jsonl", help="JSON Lines results and checkpoint file.")
+    parser.add_argument("--parquet", help="Also write successful results to this Parquet file.")
+    parser.add_argument("--workers", type=int, help=f"Extraction processes (default {BATCH_WORKERS}).")
+    parser.add_argument("--concurrency", type=int, help=f"Analyses in flight (default {BATCH_CONCURRENCY}).")
+    args = parser.parse_args(argv)
+
+    import ai_module
+    from model_backends import get_backend
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key and get_backend().requires_api_key:
+        parser.error("GEMINI_API_KEY is not set.")
+
+    model = ai_module.setup_model(api_key)
+    counts = asyncio.run(run_batch(args.source, args.output, model, args.workers, args.concurrency))
+    print(
+        f"Done: {counts['ok']} analyzed, {counts['error']} failed, {counts['skipped']} already done.",
+        file=sys.stderr,
+    )
+    if args.parquet:
+        write_parquet(args.output, args.parquet)
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
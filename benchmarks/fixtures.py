@@ -0,0 +1,80 @@
+"""
+Synthetic PDF resumes for the benchmarks.
+
+Documents are generated in memory and are a deterministic function of their
+size, so runs on different machines parse the same bytes.
+"""
+import io
+from functools import lru_cache
+import fitz  # PyMuPDF
+import numpy as np
+from PIL import Image
+
+# Edge of each generated image, in pixels; large enough to pass MIN_IMAGE_AREA.
+IMAGE_EDGE = 96
+
+_SECTIONS = [
+    ("Summary", ["Backend engineer with six years of experience building data-heavy web services."]),
+    ("Experience", [
+        "Senior Software Engineer, Acme Corp (2021 - present)",
+        "- Led the migration of the billing platform to Python microservices on Kubernetes.",
+        "- Cut p95 API latency by 40% with caching and query tuning in PostgreSQL.",
+        "Software Engineer, Initech (2018 - 2021)",
+        "- Built ETL pipelines with Airflow and Spark processing 2 TB per day.",
+    ]),
+    ("Skills", ["Python, Go, SQL, Docker, Kubernetes, AWS, Terraform, Kafka, React"]),
+    ("Projects", ["- Open-source contributor to a distributed task queue used by 3k projects."]),
+    ("Education", ["B.Sc. Computer Science, State University, 2018"]),
+]
+
+
+def _image_png(seed):
+    """Returns a unique noise image, so image deduplication keeps every one."""
+    pixels = np.random.default_rng(seed).integers(0, 256, (IMAGE_EDGE, IMAGE_EDGE, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=None)
+def make_resume_pdf(pages, images):
+    """
+    Builds a resume-like PDF.
+
+    Args:
+        pages (int): Number of pages; each repeats the resume sections.
+        images (int): Number of distinct embedded images, spread over the pages.
+
+    Returns:
+        bytes: The PDF document.
+    """
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        y = 60
+        page.insert_text((50, y), "JANE DOE", fontsize=20, fontname="hebo")
+        y += 20
+        page.insert_text((50, y), f"jane.doe@example.com | Page {number + 1} of {pages}", fontsize=9)
+        y += 24
+        for heading, lines in _SECTIONS:
+            page.insert_text((50, y), heading, fontsize=13, fontname="hebo")
+            y += 18
+            for line in lines:
+                page.insert_text((50, y), line, fontsize=10)
+                y += 14
+            y += 6
+
+    for index in range(images):
+        page = doc[index % pages]
+        column, row = index // pages % 5, index // pages // 5 % 6
+        rect = fitz.Rect(330 + column * 50, 420 + row * 50, 375 + column * 50, 465 + row * 50)
+        page.insert_image(rect, stream=_image_png(index))
+
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return data
+
+
+def as_upload(pdf_bytes):
+    """Wraps PDF bytes in a file object, like Streamlit's UploadedFile."""
+    return io.BytesIO(pdf_bytes)
@@ -0,0 +1,274 @@
+"""
+Benchmarks for startup, parsing, safety checks, prompt building, caching and whole requests.
+
+Usage:
+    python benchmarks/run.py                      # full matrix, table on stderr
+    python benchmarks/run.py --quick --output results.json --check
+    python benchmarks/run.py --baseline main.json --tolerance 0.25
+
+Model calls go to the offline fake backend, so the numbers are this app's
+own overhead. --check fails (exit status 1) when a median exceeds its budget
+in benchmarks/thresholds.json, or regresses past --tolerance against a
+--baseline results file. Neither check fires below MIN_BUDGET_MS, where
+scheduler and timer noise outweigh the code being measured.
+"""
+import os
+import sys
+
+# Benchmarks measure local overhead: no network, and no quota waits.
+os.environ.setdefault("CAREERCRAFT_MODEL_BACKEND", "fake")
+os.environ.setdefault("CAREERCRAFT_FAKE_LATENCY", "fixed:0")
+os.environ.setdefault("CAREERCRAFT_RPM", "100000000")
+os.environ.setdefault("CAREERCRAFT_TPM", "100000000000")
+os.environ.pop("CAREERCRAFT_RESPONSE_CACHE", None)
+os.environ.pop("CAREERCRAFT_PARSE_CACHE_DIR", None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import warnings
+from collections import namedtuple
+import numpy as np
+
+warnings.filterwarnings("ignore")
+
+import ai_module
+import resume_parser
+from benchmarks.fixtures import as_upload, make_resume_pdf
+from benchmarks.startup import ROOT, app_imports, import_statement
+from prompt_budget import compact_resume
+from response_cache import MemoryBackend, ResponseCache, SQLiteBackend, make_key, set_response_cache
+from utils import get_safety_filter, is_safe
+
+THRESHOLDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thresholds.json")
+# Smallest median --check will fail on; microsecond budgets flap on shared CI runners.
+MIN_BUDGET_MS = 1.0
+
+# One benchmark: `setup` runs untimed before every timed call of `func`.
+Case = namedtuple("Case", ["name", "func", "setup", "repeat"])
+
+
+def measure(case):
+    """Times a case and returns its summary statistics, in milliseconds."""
+    case.func()  # warm-up: imports, lazy singletons, allocator
+    timings = []
+    for _ in range(case.repeat):
+        if case.setup is not None:
+            case.setup()
+        started = time.perf_counter()
+        case.func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings = np.asarray(timings)
+    return {
+        "runs": len(timings),
+        "min_ms": round(float(timings.min()), 4),
+        "median_ms": round(float(np.median(timings)), 4),
+        "p95_ms": round(float(np.percentile(timings, 95)), 4),
+        "mean_ms": round(float(timings.mean()), 4),
+    }
+
+
+def _fresh_response_cache():
+    set_response_cache(ResponseCache(MemoryBackend()))
+
+
+def _reset_all_caches():
+    resume_parser.clear_parse_cache()
+    compact_resume.cache_clear()
+    _fresh_response_cache()
+
+
+# --- Suites ---
+
+def startup_cases(quick):
+    # A fresh interpreter per run: what a new container or worker pays
+    # before Streamlit can paint anything.
+    command = [sys.executable, "-c", import_statement(app_imports())]
+
+    def cold_import():
+        subprocess.run(command, cwd=ROOT, check=True, capture_output=True)
+
+    return [Case("startup/app-imports", cold_import, None, 3 if quick else 10)]
+
+
+def parsing_cases(quick):
+    pages = (1, 10) if quick else (1, 10, 50, 200)
+    images = (0, 50) if quick else (0, 50, 500)
+    cases = []
+    for page_count in pages:
+        for image_count in images:
+            pdf = make_resume_pdf(page_count, image_count)
+            label = f"{page_count}p-{image_count}img"
+            repeat = 3 if page_count * max(image_count, 1) > 5000 else 10
+
+            def extract(pdf=pdf):
+                resume_parser.extract_text_and_images_from_pdf(as_upload(pdf))
+
+            cases.append(Case(f"parse/cold/{label}", extract, resume_parser.clear_parse_cache, repeat))
+            cases.append(Case(f"parse/warm/{label}", extract, None, 50))
+        pdf = make_resume_pdf(page_count, 0)
+        cases.append(Case(
+            f"sections/cold/{page_count}p",
+            lambda pdf=pdf: resume_parser.parse_resume_sections(as_upload(pdf)),
+            resume_parser.clear_parse_cache,
+            10,
+        ))
+    return cases
+
+
+def safety_cases(quick):
+    short = "Consider a career in data engineering; strengthen your SQL skills. " * 2
+    long = short * 400  # about 50 KB, a long streamed answer
+    chunks = [long[start:start + 40] for start in range(0, len(long), 40)]
+
+    def scan_stream():
+        scanner = get_safety_filter().scanner()
+        for chunk in chunks:
+            scanner.feed(chunk)
+        scanner.finish()
+
+    return [
+        Case("is_safe/short", lambda: is_safe(short), None, 2000),
+        Case("is_safe/long-50kb", lambda: is_safe(long), None, 200),
+        Case("is_safe/stream-50kb", scan_stream, None, 100),
+    ]
+
+
+def prompt_cases(quick):
+    resume_text, _ = resume_parser.extract_text_and_images_from_pdf(as_upload(make_resume_pdf(10, 0)))
+    return [
+        Case("prompt/analysis/cold", lambda: ai_module._resume_analysis_prompt(resume_text), compact_resume.cache_clear, 200),
+        Case("prompt/analysis/warm", lambda: ai_module._resume_analysis_prompt(resume_text), None, 2000),
+    ]
+
+
+def caching_cases(quick):
+    prompt = ai_module._resume_analysis_prompt("Python developer " * 200)
+    value = "An answer. " * 300
+    memory = ResponseCache(MemoryBackend())
+    key = make_key(prompt, "gemini-1.5-flash-latest")
+    memory.set("career_advice", key, value)
+    sqlite_path = os.path.join(tempfile.mkdtemp(), "responses.sqlite3")
+    sqlite = ResponseCache(SQLiteBackend(sqlite_path))
+    sqlite.set("career_advice", key, value)
+    return [
+        Case("cache/make_key", lambda: make_key(prompt, "gemini-1.5-flash-latest"), None, 2000),
+        Case("cache/memory/get-hit", lambda: memory.get("career_advice", key), None, 2000),
+        Case("cache/memory/set", lambda: memory.set("career_advice", key, value), None, 2000),
+        Case("cache/sqlite/get-hit", lambda: sqlite.get("career_advice", key), None, 200),
+    ]
+
+
+def end_to_end_cases(quick):
+    model = ai_module.setup_model(None)
+    pdf = make_resume_pdf(2, 2)
+
+    def career_guidance():
+        # What one "Get Career Guidance" click does, minus Streamlit rendering.
+        upload = as_upload(pdf)
+        resume_text, _ = resume_parser.extract_text_and_images_from_pdf(upload)
+        sections = resume_parser.parse_resume_sections(upload)
+        ai_module.find_similar_job_descriptions(model, sections)
+        analysis = ai_module.analyze_resume(model, resume_text)
+        for view in analysis:
+            is_safe(view)
+
+    def mock_interview():
+        for chunk in ai_module.stream_mock_interview(model, "Python data structures"):
+            is_safe(chunk)
+
+    return [
+        Case("e2e/career-guidance/cold", career_guidance, _reset_all_caches, 20),
+        Case("e2e/career-guidance/warm", career_guidance, None, 50),
+        Case("e2e/mock-interview-stream/cold", mock_interview, _fresh_response_cache, 50),
+        Case("e2e/mock-interview-stream/warm", mock_interview, None, 200),
+    ]
+
+
+SUITES = {
+    "startup": startup_cases,
+    "parsing": parsing_cases,
+    "safety": safety_cases,
+    "prompts": prompt_cases,
+    "caching": caching_cases,
+    "e2e": end_to_end_cases,
+}
+
+
+def check(results, thresholds, baseline=None, tolerance=0.25):
+    """
+    Compares results with absolute budgets and, optionally, a baseline run.
+
+    Returns:
+        list: A message per regression; empty if everything passed.
+    """
+    failures = []
+    for name, stats in results.items():
+        budget = thresholds.get(name)
+        if budget is not None:
+            budget = max(budget, MIN_BUDGET_MS)
+            if stats["median_ms"] > budget:
+                failures.append(f"{name}: median {stats['median_ms']:.3f} ms exceeds budget {budget} ms")
+        previous = (baseline or {}).get(name)
+        if previous is not None and stats["median_ms"] > max(previous["median_ms"] * (1 + tolerance), MIN_BUDGET_MS):
+            failures.append(
+                f"{name}: median {stats['median_ms']:.3f} ms regressed from "
+                f"{previous['median_ms']:.3f} ms (tolerance {tolerance:.0%})"
+            )
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the CareerCraft benchmarks.")
+    parser.add_argument("--quick", action="store_true", help="Smaller fixture matrix, for CI.")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="Run only these suites.")
+    parser.add_argument("--output", "-o", help="Write results as JSON to this file.")
+    parser.add_argument("--check", action="store_true", help="Fail if a budget in thresholds.json is exceeded.")
+    parser.add_argument("--baseline", help="Results JSON from an earlier run to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against --baseline.")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for suite in args.suite or SUITES:
+        for case in SUITES[suite](args.quick):
+            results[case.name] = stats = measure(case)
+            print(
+                f"{case.name:<40} median {stats['median_ms']:>10.3f} ms   p95 {stats['p95_ms']:>10.3f} ms",
+                file=sys.stderr,
+            )
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+            "timestamp": time.time(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if not (args.check or args.baseline):
+        return 0
+    thresholds = {}
+    if args.check:
+        with open(THRESHOLDS_PATH, encoding="utf-8") as f:
+            thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    failures = check(results, thresholds, baseline, args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Import-time report for the app's cold start.
+
+Usage:
+    python benchmarks/startup.py                  # what app.py imports before first paint
+    python benchmarks/startup.py --top 30 ai_module resume_parser
+    python benchmarks/startup.py --check          # fail if a lazy dependency loads at startup
+
+Runs the imports in a fresh interpreter with `python -X importtime` and
+prints the slowest modules, both by cumulative time (a module and everything
+it pulled in) and by self time. Heavy dependencies that are meant to load on
+first use of a feature (LAZY_MODULES) are flagged if anything imports them
+at startup.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import ast
+import subprocess
+from collections import namedtuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+# Loaded by the feature that needs them, never by `import app`'s dependencies.
+LAZY_MODULES = ("google.generativeai", "fitz", "PIL", "requests")
+
+# One line of -X importtime output; times in microseconds.
+ImportTime = namedtuple("ImportTime", ["module", "self_us", "cumulative_us", "depth"])
+
+
+def app_imports(path=APP_PATH):
+    """Returns the modules app.py imports at the top level, in order."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def import_statement(modules):
+    return "import " + ", ".join(modules)
+
+
+def measure_imports(modules):
+    """
+    Imports modules in a fresh interpreter under -X importtime.
+
+    Returns:
+        list: An ImportTime per module loaded, in import order.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", import_statement(modules)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # the header row
+        module = name.strip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times.append(ImportTime(module, int(self_us), int(cumulative_us), depth))
+    return times
+
+
+def eager_lazy_modules(times):
+    """Returns the LAZY_MODULES that were imported anyway."""
+    loaded = {entry.module for entry in times}
+    return [
+        lazy for lazy in LAZY_MODULES
+        if any(module == lazy or module.startswith(lazy + ".") for module in loaded)
+    ]
+
+
+def _print_table(title, rows, key):
+    print(title)
+    for entry in rows:
+        print(f"  {getattr(entry, key) / 1000:>9.1f} ms  {entry.module}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report import times at app startup.")
+    parser.add_argument("modules", nargs="*", help="Modules to import; defaults to app.py's imports.")
+    parser.add_argument("--top", type=int, default=15, help="Rows per table.")
+    parser.add_argument("--check", action="store_true", help="Fail if a LAZY_MODULES entry is imported.")
+    args = parser.parse_args(argv)
+
+    modules = args.modules or app_imports()
+    times = measure_imports(modules)
+    total_us = sum(entry.cumulative_us for entry in times if entry.depth == 0)
+
+    print(f"{import_statement(modules)}")
+    print(f"{len(times)} modules, {total_us / 1000:.1f} ms in imports\n")
+    requested = [entry for entry in times if entry.depth == 0 and entry.module in modules]
+    _print_table("Requested modules (cumulative):", sorted(requested, key=lambda e: -e.cumulative_us), "cumulative_us")
+    print()
+    heaviest = sorted(times, key=lambda e: -e.cumulative_us)[:args.top]
+    _print_table(f"Top {args.top} by cumulative time:", heaviest, "cumulative_us")
+    print()
+    _print_table(f"Top {args.top} by self time:", sorted(times, key=lambda e: -e.self_us)[:args.top], "self_us")
+
+    eager = eager_lazy_modules(times)
+    if eager:
+        print(f"\nLoaded at startup but meant to be lazy: {', '.join(eager)}")
+    return 1 if args.check and eager else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
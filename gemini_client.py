@@ -0,0 +1,265 @@
+import os
+import time
+import asyncio
+import itertools
+import threading
+from collections import deque
+from rate_limiter import RateLimitTimeout
+from resilience import ResilientCaller
+
+# --- Client Settings ---
+# Upper bound on model calls in flight at once across the whole process.
+MAX_CONCURRENT_REQUESTS = int(os.getenv("CAREERCRAFT_MAX_CONCURRENCY", "8"))
+HTTP_TIMEOUT = float(os.getenv("CAREERCRAFT_HTTP_TIMEOUT", "60"))
+# Timeout on each SDK call, separate from the request deadline, which only
+# bounds retries, backoff and slot waits.
+ATTEMPT_TIMEOUT = float(os.getenv("CAREERCRAFT_ATTEMPT_TIMEOUT", "60"))
+# Timeout on a streaming call. It covers the whole stream, so it allows for
+# answers that take minutes to finish.
+STREAM_TIMEOUT = float(os.getenv("CAREERCRAFT_STREAM_TIMEOUT", "300"))
+
+
+class SlotTimeout(RateLimitTimeout):
+    """
+    Raised when no model call slot freed up before the request deadline.
+
+    The wait is local, so it says nothing about the service: it is not
+    retried and does not count towards the circuit breaker.
+    """
+
+
+class ConcurrencySlots:
+    """
+    A counting semaphore that threads and coroutines can both wait on.
+
+    Waiters are served in arrival order. Coroutines wait on their event loop
+    rather than in a worker thread, so a backlog of async callers does not
+    tie up the default executor.
+
+    Args:
+        size (int): Number of slots.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._free = size
+        self._cond = threading.Condition()
+        self._queue = deque()
+        # Ticket -> (event loop, asyncio.Event) for each waiting coroutine.
+        self._async_waiters = {}
+        self._tickets = itertools.count()
+
+    def acquire(self, blocking=True, timeout=None):
+        """Takes a slot; returns False if none freed up within timeout."""
+        with self._cond:
+            if self._free and not self._queue:
+                self._free -= 1
+                return True
+            if not blocking or (timeout is not None and timeout <= 0):
+                return False
+            ticket = next(self._tickets)
+            self._queue.append(ticket)
+            deadline = None if timeout is None else time.monotonic() + timeout
+            try:
+                while not self._is_turn(ticket):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                self._take()
+                return True
+            finally:
+                self._leave(ticket)
+
+    async def aacquire(self, timeout=None):
+        """Async counterpart of acquire(); waits without blocking the event loop."""
+        wake = asyncio.Event()
+        with self._cond:
+            if self._free and not self._queue:
+                self._free -= 1
+                return True
+            ticket = next(self._tickets)
+            self._queue.append(ticket)
+            self._async_waiters[ticket] = (asyncio.get_running_loop(), wake)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while True:
+                with self._cond:
+                    # Cleared under the lock, so a release after this check still wakes us.
+                    wake.clear()
+                    if self._is_turn(ticket):
+                        self._take()
+                        return True
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                try:
+                    await asyncio.wait_for(wake.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._cond:
+                del self._async_waiters[ticket]
+                self._leave(ticket)
+
+    def release(self):
+        with self._cond:
+            if self._free >= self.size:
+                raise ValueError("Slot released too many times.")
+            self._free += 1
+            self._notify()
+
+    # The helpers below expect the lock to be held.
+
+    def _is_turn(self, ticket):
+        return self._free > 0 and self._queue[0] == ticket
+
+    def _take(self):
+        self._queue.popleft()
+        self._free -= 1
+
+    def _leave(self, ticket):
+        if ticket in self._queue:
+            self._queue.remove(ticket)
+        # The next waiter may be able to go now, if slots are still free.
+        self._notify()
+
+    def _notify(self):
+        self._cond.notify_all()
+        for loop, wake in self._async_waiters.values():
+            loop.call_soon_threadsafe(wake.set)
+
+
+class GeminiClient:
+    """
+    Process-wide entry point for every Gemini call.
+
+    It configures the SDK once per API key, so the SDK keeps its gRPC channel
+    (and its TLS session) alive between Streamlit reruns. REST calls share one
+    pooled keep-alive HTTP session. A semaphore bounds the number of calls in
+    flight, for both the sync and the asyncio entry points, and every call
+    goes through the retry/deadline/circuit-breaker layer.
+
+    Args:
+        max_concurrency (int): Maximum number of concurrent model calls.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENT_REQUESTS):
+        self.max_concurrency = max_concurrency
+        self._slots = ConcurrencySlots(max_concurrency)
+        self.resilience = ResilientCaller()
+        self._configured_key = None
+        self._configure_lock = threading.Lock()
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def configure(self, api_key):
+        """Configures the SDK, skipping the call if the key has not changed."""
+        with self._configure_lock:
+            if self._configured_key != api_key:
+                # The SDK takes most of a second to import; defer it until a model is set up.
+                import google.generativeai as genai
+
+                genai.configure(api_key=api_key)
+                self._configured_key = api_key
+
+    @property
+    def session(self):
+        """The pooled HTTP session used for REST calls."""
+        return self._session
+
+    def generate(self, model, contents, **kwargs):
+        """Calls model.generate_content within the concurrency limit."""
+        return self.resilience.call(self._generate_once, model, contents, **kwargs)
+
+    def _acquire(self, deadline):
+        """Takes a concurrency slot, waiting no later than the request deadline."""
+        if not self._slots.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            raise SlotTimeout("Timed out waiting for a free model call slot.")
+
+    def _generate_once(self, model, contents, deadline, **kwargs):
+        # The slot is released between retries, so backoff waits don't hold it.
+        self._acquire(deadline)
+        try:
+            return model.generate_content(contents, request_options={"timeout": ATTEMPT_TIMEOUT}, **kwargs)
+        finally:
+            self._slots.release()
+
+    def stream(self, model, contents, **kwargs):
+        """
+        Yields the chunks of a streaming generate_content call.
+
+        Opening the stream is retried like any other call; once chunks have
+        been yielded, errors propagate. The concurrency slot is held until the
+        stream is exhausted or closed, and the stream gets STREAM_TIMEOUT
+        rather than the per-call timeout.
+        """
+        response = self.resilience.call(self._open_stream, model, contents, **kwargs)
+        try:
+            for chunk in response:
+                yield chunk
+        finally:
+            self._slots.release()
+
+    def _open_stream(self, model, contents, deadline, **kwargs):
+        self._acquire(deadline)
+        try:
+            return model.generate_content(contents, stream=True, request_options={"timeout": STREAM_TIMEOUT}, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def agenerate(self, model, contents, **kwargs):
+        """Awaits model.generate_content_async within the concurrency limit."""
+        return await self.resilience.acall(self._agenerate_once, model, contents, **kwargs)
+
+    async def _agenerate_once(self, model, contents, deadline, **kwargs):
+        await self._acquire_async(deadline)
+        try:
+            return await model.generate_content_async(contents, request_options={"timeout": ATTEMPT_TIMEOUT}, **kwargs)
+        finally:
+            self._slots.release()
+
+    async def _acquire_async(self, deadline):
+        """Like _acquire, but waits on the event loop instead of blocking it."""
+        if not await self._slots.aacquire(timeout=max(deadline - time.monotonic(), 0)):
+            raise SlotTimeout("Timed out waiting for a free model call slot.")
+
+    def post_json(self, url, payload, timeout=HTTP_TIMEOUT, **kwargs):
+        """
+        POSTs a JSON payload over the pooled session within the concurrency limit.
+
+        Each attempt waits at most `timeout` seconds.
+
+        Raises:
+            requests.exceptions.RequestException: If the request still fails
+                after retries, including HTTP error statuses.
+        """
+        return self.resilience.call(self._post_once, url, payload, timeout, **kwargs)
+
+    def _post_once(self, url, payload, http_timeout, deadline, **kwargs):
+        self._acquire(deadline)
+        try:
+            response = self._session.post(url, json=payload, timeout=http_timeout, **kwargs)
+        finally:
+            self._slots.release()
+        response.raise_for_status()  # Raise an exception for bad status codes
+        return response
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Returns the process-wide GeminiClient, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GeminiClient()
+        return _client
@@ -0,0 +1,99 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from metrics import timed
+
+# --- Model Upload Settings ---
+# Longest edge, in pixels, of any image sent to the model.
+MAX_IMAGE_EDGE = int(os.getenv("CAREERCRAFT_MAX_IMAGE_EDGE", "1024"))
+# Re-encoding format for uploads: "JPEG" or "WEBP".
+IMAGE_FORMAT = os.getenv("CAREERCRAFT_IMAGE_FORMAT", "JPEG").upper()
+IMAGE_QUALITY = int(os.getenv("CAREERCRAFT_IMAGE_QUALITY", "85"))
+
+PREPARED_CACHE_MAX_ENTRIES = 64
+
+_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+_prepared_cache = OrderedDict()
+_prepared_cache_lock = threading.Lock()
+
+
+def _to_upload_mode(img, image_format):
+    """Converts an image to a mode the target encoder can write."""
+    if image_format == "WEBP":
+        return img if img.mode in ("RGB", "RGBA") else img.convert("RGBA" if "A" in img.getbands() else "RGB")
+
+    from PIL import Image
+
+    # JPEG has no alpha channel, so flatten transparent images onto white.
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img if img.mode == "RGB" else img.convert("RGB")
+
+
+def _encode_for_upload(image_bytes, max_edge, image_format, quality):
+    # Pillow is imported on the first upload, not when the app starts.
+    from PIL import Image, ImageOps
+
+    img = Image.open(BytesIO(image_bytes))
+
+    # For JPEGs, let the decoder downscale by a power of two while decoding,
+    # which is much cheaper than decoding at full size and resizing afterwards.
+    if img.format == "JPEG":
+        img.draft("RGB", (max_edge, max_edge))
+
+    # Apply the EXIF orientation before the metadata is dropped on re-encode.
+    img = ImageOps.exif_transpose(img)
+    img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    img = _to_upload_mode(img, image_format)
+
+    out = BytesIO()
+    # No exif= argument is passed, so the re-encoded image carries no EXIF data.
+    img.save(out, format=image_format, quality=quality, optimize=True)
+    return out.getvalue()
+
+
+@timed("image_utils.prepare_image")
+def prepare_image(image_bytes, max_edge=None, image_format=None, quality=None):
+    """
+    Downsizes and re-encodes an image before it is uploaded to the model.
+
+    Results are cached by a digest of the input bytes and settings, so the
+    same image is only decoded and encoded once per process.
+
+    Args:
+        image_bytes (bytes): The original image file contents.
+        max_edge (int, optional): Longest edge in pixels. Defaults to MAX_IMAGE_EDGE.
+        image_format (str, optional): "JPEG" or "WEBP". Defaults to IMAGE_FORMAT.
+        quality (int, optional): Encoder quality. Defaults to IMAGE_QUALITY.
+
+    Returns:
+        dict: An inline blob ({"mime_type", "data"}) accepted by generate_content.
+    """
+    max_edge = max_edge or MAX_IMAGE_EDGE
+    image_format = (image_format or IMAGE_FORMAT).upper()
+    quality = quality or IMAGE_QUALITY
+    if image_format not in _MIME_TYPES:
+        raise ValueError(f"Unsupported upload format: {image_format}")
+
+    key = (hashlib.sha256(image_bytes).hexdigest(), max_edge, image_format, quality)
+    with _prepared_cache_lock:
+        if key in _prepared_cache:
+            _prepared_cache.move_to_end(key)
+            return _prepared_cache[key]
+
+    blob = {
+        "mime_type": _MIME_TYPES[image_format],
+        "data": _encode_for_upload(image_bytes, max_edge, image_format, quality),
+    }
+
+    with _prepared_cache_lock:
+        _prepared_cache[key] = blob
+        while len(_prepared_cache) > PREPARED_CACHE_MAX_ENTRIES:
+            _prepared_cache.popitem(last=False)
+    return blob
@@ -0,0 +1,301 @@
+import os
+import re
+import json
+import zlib
+import hashlib
+import tempfile
+import threading
+from collections import namedtuple
+import numpy as np
+
+# --- Index Settings ---
+# Job descriptions to index, one JSON object per line with "id", "title" and
+# "description".
+JOB_CORPUS_PATH = os.getenv(
+    "CAREERCRAFT_JOB_CORPUS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "job_descriptions.jsonl"),
+)
+# Where the embedding matrix and its metadata are written.
+JOB_INDEX_DIR = os.getenv(
+    "CAREERCRAFT_JOB_INDEX_DIR", os.path.join(tempfile.gettempdir(), "careercraft-job-index")
+)
+# "hashing" runs offline; "gemini" uses the Gemini embedding API.
+JOB_EMBEDDER = os.getenv("CAREERCRAFT_JOB_EMBEDDER", "hashing")
+HASHING_DIMENSIONS = 2048
+# Rows scored per matrix multiply, bounding memory on large corpora.
+SEARCH_BATCH_ROWS = 8192
+# Texts embedded per call while building the index.
+EMBED_BATCH_SIZE = 64
+
+# A job description returned by a search, with its cosine similarity.
+JobMatch = namedtuple("JobMatch", ["score", "id", "title", "description"])
+
+_WORD_RE = re.compile(r"[a-z0-9+#.]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is of on or our the to we with you your "
+    "will work working experience required preferred plus strong years".split()
+)
+
+
+class HashingEmbedder:
+    """
+    Embeds text by hashing words and word bigrams into a fixed-size vector.
+
+    Needs no vocabulary, model or network access, so it is the offline
+    fallback. Counts are log-scaled and rows L2-normalized, so dot products
+    are cosine similarities.
+
+    Args:
+        dimensions (int): Length of each embedding.
+    """
+
+    def __init__(self, dimensions=HASHING_DIMENSIONS):
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+
+    def _features(self, text):
+        words = [word.strip(".") for word in _WORD_RE.findall(text.lower())]
+        words = [word for word in words if word and word not in _STOPWORDS]
+        return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+    def embed(self, texts):
+        """
+        Embeds a batch of texts.
+
+        Returns:
+            numpy.ndarray: A float32 matrix with one unit-length row per text.
+        """
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                # crc32 is stable across processes, unlike hash().
+                digest = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                vectors[row, digest % self.dimensions] += sign
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class GeminiEmbedder:
+    """
+    Embeds text with the Gemini embedding API.
+
+    Requires genai.configure() to have been called, e.g. by
+    ai_module.setup_model().
+    """
+
+    def __init__(self, model="models/text-embedding-004"):
+        self.model = model
+        self.name = model
+
+    def embed(self, texts):
+        import google.generativeai as genai
+
+        result = genai.embed_content(model=self.model, content=list(texts))
+        vectors = np.asarray(result["embedding"], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+_EMBEDDERS = {"hashing": HashingEmbedder, "gemini": GeminiEmbedder}
+
+
+def get_embedder(name=None):
+    """Returns a new embedder by name; defaults to JOB_EMBEDDER."""
+    return _EMBEDDERS[name or JOB_EMBEDDER]()
+
+
+def load_corpus(path=None):
+    """Reads job description records from a JSON Lines file."""
+    with open(path or JOB_CORPUS_PATH, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _document_text(record):
+    return f"{record['title']}\n{record['description']}"
+
+
+def _corpus_digest(records):
+    payload = json.dumps(records, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _temp_path(directory, name):
+    """Creates an empty, uniquely named temp file for name in directory and returns its path."""
+    fd, tmp_path = tempfile.mkstemp(prefix=name + ".", suffix=".tmp", dir=directory)
+    os.close(fd)
+    return tmp_path
+
+
+def _remove_if_exists(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class JobIndex:
+    """
+    Cosine top-k search over job descriptions embedded into a memory-mapped matrix.
+
+    The matrix is stored as raw float32 rows in embeddings.f32 next to
+    meta.json, and opened read-only with numpy.memmap, so processes share the
+    page cache instead of each holding a copy.
+
+    Args:
+        path (str): The index directory.
+        embedder: Any object with a `name` and an `embed(texts)` method
+            returning unit-length float32 rows.
+    """
+
+    def __init__(self, path, embedder):
+        self.path = path
+        self.embedder = embedder
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.records = meta["records"]
+        self.corpus_digest = meta["corpus_digest"]
+        self.embedder_name = meta["embedder"]
+        if self.records:
+            self._matrix = np.memmap(
+                os.path.join(path, "embeddings.f32"),
+                dtype=np.float32,
+                mode="r",
+                shape=(len(self.records), meta["dimensions"]),
+            )
+        else:
+            self._matrix = np.zeros((0, meta["dimensions"]), dtype=np.float32)
+
+    @classmethod
+    def build(cls, path, records, embedder):
+        """
+        Embeds records in batches and writes a new index to path.
+
+        Returns:
+            JobIndex: The opened index.
+        """
+        os.makedirs(path, exist_ok=True)
+        # Metadata is removed first and written last, so a crash mid-build
+        # never leaves an index whose metadata describes a different matrix.
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        dimensions = None
+        matrix = None
+        # Temp files are unique per build, so processes sharing the index
+        # directory never write into each other's half-built files.
+        tmp_matrix_path = _temp_path(path, "embeddings.f32")
+        try:
+            for start in range(0, len(records), EMBED_BATCH_SIZE):
+                batch = records[start:start + EMBED_BATCH_SIZE]
+                vectors = embedder.embed([_document_text(record) for record in batch])
+                if matrix is None:
+                    dimensions = vectors.shape[1]
+                    matrix = np.memmap(
+                        tmp_matrix_path, dtype=np.float32, mode="w+", shape=(len(records), dimensions)
+                    )
+                matrix[start:start + len(batch)] = vectors
+            if matrix is not None:
+                matrix.flush()
+                del matrix
+                os.replace(tmp_matrix_path, os.path.join(path, "embeddings.f32"))
+        finally:
+            _remove_if_exists(tmp_matrix_path)
+
+        meta = {
+            "embedder": embedder.name,
+            "dimensions": dimensions or 0,
+            "corpus_digest": _corpus_digest(records),
+            "records": records,
+        }
+        tmp_meta_path = _temp_path(path, "meta.json")
+        try:
+            with open(tmp_meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_meta_path, meta_path)
+        finally:
+            _remove_if_exists(tmp_meta_path)
+        return cls(path, embedder)
+
+    def search(self, query_vectors, k=3):
+        """
+        Finds the k most similar job descriptions for each query vector.
+
+        The matrix is scored SEARCH_BATCH_ROWS rows at a time, keeping a
+        running top-k per query, so memory stays flat however large the
+        corpus is.
+
+        Args:
+            query_vectors (numpy.ndarray): Unit-length rows, one per query.
+            k (int): Matches to return per query.
+
+        Returns:
+            list: One list of JobMatch per query, best first.
+        """
+        queries = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        k = min(k, len(self.records))
+        if k <= 0:
+            return [[] for _ in queries]
+
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), k), dtype=np.int64)
+        for start in range(0, len(self.records), SEARCH_BATCH_ROWS):
+            chunk = self._matrix[start:start + SEARCH_BATCH_ROWS]
+            scores = queries @ chunk.T
+            rows = np.broadcast_to(np.arange(start, start + len(chunk)), scores.shape)
+            # Merge this chunk's scores with the running top-k and keep the best k.
+            scores = np.concatenate([best_scores, scores], axis=1)
+            rows = np.concatenate([best_rows, rows], axis=1)
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(scores, top, axis=1)
+            best_rows = np.take_along_axis(rows, top, axis=1)
+
+        results = []
+        for scores, rows in zip(best_scores, best_rows):
+            order = np.argsort(-scores)
+            results.append([
+                JobMatch(float(scores[i]), **{
+                    field: self.records[rows[i]][field] for field in ("id", "title", "description")
+                })
+                for i in order
+            ])
+        return results
+
+    def query(self, texts, k=3):
+        """Embeds texts and returns their top-k matches; see search()."""
+        return self.search(self.embedder.embed(list(texts)), k)
+
+
+_job_index = None
+_job_index_lock = threading.Lock()
+
+
+def get_job_index():
+    """
+    Returns the process-wide job index, building it on first use.
+
+    The index on disk is reused unless the corpus or the embedder changed
+    since it was built.
+    """
+    global _job_index
+    with _job_index_lock:
+        if _job_index is None:
+            embedder = get_embedder()
+            records = load_corpus()
+            try:
+                index = JobIndex(JOB_INDEX_DIR, embedder)
+                if index.embedder_name != embedder.name or index.corpus_digest != _corpus_digest(records):
+                    index = None
+            except (OSError, ValueError, KeyError):
+                index = None
+            _job_index = index or JobIndex.build(JOB_INDEX_DIR, records, embedder)
+        return _job_index
+
+
+def set_job_index(index):
+    """Replaces the process-wide job index, e.g. with one over another corpus."""
+    global _job_index
+    with _job_index_lock:
+        _job_index = index
@@ -0,0 +1,166 @@
+import os
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+# --- Job Settings ---
+JOB_WORKERS = int(os.getenv("CAREERCRAFT_JOB_WORKERS", "4"))
+# Finished jobs are kept this long so a rerun or a reconnecting session can
+# still pick up the result.
+JOB_RETENTION_SECONDS = 15 * 60
+MAX_JOBS = 512
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    """
+    A unit of background work and its outcome.
+
+    Attributes:
+        id (str): The job ID, safe to keep in st.session_state.
+        state (str): PENDING, RUNNING, DONE or FAILED.
+        partial (str): Text produced so far by a streaming job.
+        result: The return value once the job is DONE.
+        error (BaseException): The exception once the job has FAILED.
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.state = PENDING
+        self.partial = ""
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED)
+
+
+class InlineExecutor(Executor):
+    """
+    Runs submitted work immediately in the calling thread.
+
+    A deterministic in-process stand-in for the thread or process pool, for
+    tests and for debugging job code.
+    """
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        return future
+
+
+class JobQueue:
+    """
+    Runs slow calls outside the Streamlit script thread and tracks them by ID.
+
+    Args:
+        executor (concurrent.futures.Executor, optional): Where jobs run. A
+            ThreadPoolExecutor by default; a ProcessPoolExecutor also works
+            for picklable functions passed to submit().
+    """
+
+    def __init__(self, executor=None):
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=JOB_WORKERS, thread_name_prefix="careercraft-job"
+        )
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _register(self):
+        job = Job()
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        return job
+
+    def _prune(self):
+        """Forgets expired finished jobs, and the oldest finished ones beyond MAX_JOBS."""
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and (job.finished_at < cutoff or len(self._jobs) >= MAX_JOBS):
+                del self._jobs[job_id]
+
+    def _track(self, job, future):
+        def on_done(done):
+            job.finished_at = time.time()
+            try:
+                job.result = done.result()
+                job.state = DONE
+            except BaseException as exc:
+                job.error = exc
+                job.state = FAILED
+
+        future.add_done_callback(on_done)
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Runs func(*args, **kwargs) in the background.
+
+        Returns:
+            str: The job ID.
+        """
+        job = self._register()
+        job.state = RUNNING
+        self._track(job, self._executor.submit(func, *args, **kwargs))
+        return job.id
+
+    def submit_stream(self, stream):
+        """
+        Consumes an iterable of text chunks in the background.
+
+        The text received so far is available as Job.partial while the job
+        runs, and the joined text is the job's result. Requires a thread-based
+        executor, since streams cannot be sent to another process.
+
+        Returns:
+            str: The job ID.
+        """
+        job = self._register()
+
+        def consume():
+            job.state = RUNNING
+            parts = []
+            for chunk in stream:
+                parts.append(chunk)
+                job.partial = "".join(parts)
+            return "".join(parts)
+
+        self._track(job, self._executor.submit(consume))
+        return job.id
+
+    def get(self, job_id):
+        """Returns the Job for job_id, or None if it is unknown or has expired."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Returns the process-wide job queue, shared by every Streamlit session."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
+
+
+def set_job_queue(queue):
+    """Replaces the process-wide job queue, e.g. with JobQueue(InlineExecutor())."""
+    global _job_queue
+    with _job_queue_lock:
+        _job_queue = queue
@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import inspect
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# --- Metrics Settings ---
+# Latency percentiles are computed over this many recent samples per series.
+SAMPLE_WINDOW = int(os.getenv("CAREERCRAFT_METRICS_WINDOW", "2048"))
+# Append every span to this JSON Lines file; leave unset to keep metrics in memory.
+METRICS_JSONL_PATH = os.getenv("CAREERCRAFT_METRICS_JSONL")
+METRIC_PREFIX = "careercraft"
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _quantile(ordered, q):
+    """Nearest-rank quantile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ""
+    escaped = (
+        name + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class _Series:
+    """Count, sum and a window of recent samples for one span and label set."""
+
+    def __init__(self, window):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+
+class JsonlExporter:
+    """Appends one JSON object per finished span to a file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, event):
+        line = json.dumps(event) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+class Metrics:
+    """
+    In-process timing spans and counters.
+
+    Spans are summarized per name and label set (count, sum, p50/p95/p99
+    over the last SAMPLE_WINDOW samples); counters hold cache hits, token
+    counts and the like. Both can be rendered in the Prometheus text format.
+
+    Args:
+        window (int): Samples kept per span series for the percentiles.
+        exporters (list, optional): Objects with an export(event) method,
+            called with every finished span.
+    """
+
+    def __init__(self, window=SAMPLE_WINDOW, exporters=None):
+        self.window = window
+        self.exporters = list(exporters or [])
+        self._spans = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, span, seconds, **labels):
+        """Records one duration for a span."""
+        key = (span, _label_key(labels))
+        with self._lock:
+            series = self._spans.get(key)
+            if series is None:
+                series = self._spans[key] = _Series(self.window)
+            series.add(seconds)
+        for exporter in self.exporters:
+            exporter.export({"ts": time.time(), "span": span, "labels": labels, "seconds": seconds})
+
+    def inc(self, name, amount=1, **labels):
+        """Adds amount to a counter."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Times the enclosed block; failures are recorded with outcome="error"."""
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            yield
+        except GeneratorExit:
+            # A generator closed by its reader stopped early; it did not fail.
+            raise
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, outcome=outcome, **labels)
+
+    def snapshot(self):
+        """
+        Returns every series with its aggregates.
+
+        Returns:
+            dict: "spans" (count, sum and p50/p95/p99 in seconds per series)
+                and "counters" (value per series), each with its labels.
+        """
+        with self._lock:
+            spans = [
+                (name, labels, series.count, series.total, sorted(series.samples))
+                for (name, labels), series in self._spans.items()
+            ]
+            counters = list(self._counters.items())
+        return {
+            "spans": [
+                {
+                    "span": name,
+                    "labels": dict(labels),
+                    "count": count,
+                    "sum": total,
+                    **{f"p{int(q * 100)}": _quantile(ordered, q) for q in QUANTILES},
+                }
+                for name, labels, count, total, ordered in sorted(spans)
+            ],
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(counters)
+            ],
+        }
+
+    def render_prometheus(self):
+        """Returns all metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        metric = f"{METRIC_PREFIX}_span_seconds"
+        lines = [f"# TYPE {metric} summary"]
+        for series in snapshot["spans"]:
+            labels = [("span", series["span"])] + sorted(series["labels"].items())
+            for q in QUANTILES:
+                value = series[f"p{int(q * 100)}"]
+                lines.append(f"{metric}{_format_labels(labels + [('quantile', str(q))])} {value:.6f}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {series['sum']:.6f}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {series['count']}")
+
+        typed = set()
+        for counter in snapshot["counters"]:
+            name = f"{METRIC_PREFIX}_{counter['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_format_labels(sorted(counter['labels'].items()))} {counter['value']}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Forgets every span and counter."""
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """Returns the process-wide metrics registry."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            exporters = [JsonlExporter(METRICS_JSONL_PATH)] if METRICS_JSONL_PATH else []
+            _metrics = Metrics(exporters=exporters)
+        return _metrics
+
+
+def set_metrics(metrics):
+    """Replaces the process-wide metrics registry."""
+    global _metrics
+    with _metrics_lock:
+        _metrics = metrics
+
+
+def span(name, **labels):
+    """Times a block with the process-wide registry; see Metrics.span()."""
+    return get_metrics().span(name, **labels)
+
+
+def inc(name, amount=1, **labels):
+    """Adds to a counter in the process-wide registry."""
+    get_metrics().inc(name, amount, **labels)
+
+
+def timed(name, **labels):
+    """
+    Decorates a function, coroutine function or generator function with a span.
+
+    A generator is timed from its first item until it is exhausted or closed.
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, **labels):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                with span(name, **labels):
+                    yield from func(*args, **kwargs)
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def record_usage(feature, response):
+    """Counts prompt and output tokens from a response's usage_metadata, if present."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    for kind, attribute in (("prompt", "prompt_token_count"), ("output", "candidates_token_count")):
+        count = getattr(usage, attribute, None)
+        if count:
+            inc("model_tokens_total", count, feature=feature, kind=kind)
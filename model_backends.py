@@ -0,0 +1,317 @@
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from collections import namedtuple
+import google.api_core.exceptions
+
+# --- Backend Selection ---
+# "gemini" calls the real API; "fake" answers locally, for benchmarks and tests.
+MODEL_BACKEND = os.getenv("CAREERCRAFT_MODEL_BACKEND", "gemini")
+
+# --- Model Selection ---
+DEFAULT_MODEL = os.getenv("CAREERCRAFT_MODEL", "gemini-1.5-flash-latest")
+# Per-feature overrides as "feature=model,...", e.g.
+# "resume_analysis=gemini-1.5-pro-latest"; other features use DEFAULT_MODEL.
+FEATURE_MODELS_SPEC = os.getenv("CAREERCRAFT_FEATURE_MODELS", "")
+
+# --- Fake Backend Settings ---
+# Time to first token: "fixed:SECONDS", "uniform:LOW,HIGH" or
+# "lognormal:MEDIAN,SIGMA" (seconds).
+FAKE_LATENCY = os.getenv("CAREERCRAFT_FAKE_LATENCY", "fixed:0")
+# Extra delay between streamed chunks, in seconds.
+FAKE_CHUNK_DELAY = float(os.getenv("CAREERCRAFT_FAKE_CHUNK_DELAY", "0"))
+FAKE_CHUNK_CHARS = int(os.getenv("CAREERCRAFT_FAKE_CHUNK_CHARS", "40"))
+FAKE_RESPONSE_WORDS = int(os.getenv("CAREERCRAFT_FAKE_RESPONSE_WORDS", "120"))
+# Fraction of calls that fail, and the HTTP statuses they fail with.
+FAKE_ERROR_RATE = float(os.getenv("CAREERCRAFT_FAKE_ERROR_RATE", "0"))
+FAKE_ERROR_CODES = tuple(
+    int(code) for code in os.getenv("CAREERCRAFT_FAKE_ERROR_CODES", "429,503").split(",") if code
+)
+# Seeds latency and error injection, so a run can be repeated exactly.
+FAKE_SEED = int(os.getenv("CAREERCRAFT_FAKE_SEED", "0"))
+
+# Token counts in the shape of the SDK's usage_metadata.
+FakeUsage = namedtuple("FakeUsage", ["prompt_token_count", "candidates_token_count", "total_token_count"])
+# A response or streamed chunk in the shape the rest of the app reads.
+FakeResponse = namedtuple("FakeResponse", ["text", "usage_metadata"])
+
+_FILLER_WORDS = (
+    "skills experience project team python data cloud design systems career growth "
+    "learning interview role impact build deliver improve communication leadership "
+    "analysis testing api service performance course certification practice"
+).split()
+_JSON_FIELD_RE = re.compile(r'"(\w+)":')
+
+
+def parse_feature_models(spec):
+    """
+    Parses per-feature model overrides.
+
+    Args:
+        spec (str): Comma-separated "feature=model" pairs.
+
+    Returns:
+        dict: Model name per feature.
+    """
+    models = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        feature, sep, model_name = entry.partition("=")
+        if not sep or not feature.strip() or not model_name.strip():
+            raise ValueError(f"Expected feature=model, got {entry!r}")
+        models[feature.strip()] = model_name.strip()
+    return models
+
+
+FEATURE_MODELS = parse_feature_models(FEATURE_MODELS_SPEC)
+
+
+def parse_latency(spec):
+    """
+    Parses a latency distribution spec into a sampling function.
+
+    Args:
+        spec (str): "fixed:S", "uniform:LOW,HIGH" or "lognormal:MEDIAN,SIGMA".
+
+    Returns:
+        callable: Takes a random.Random and returns a delay in seconds.
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(value) for value in args.split(",") if value]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2 and values[0] > 0:
+        median, sigma = values
+        return lambda rng: rng.lognormvariate(0.0, sigma) * median
+    raise ValueError(f"Unrecognized latency distribution: {spec!r}")
+
+
+def _prompt_text(contents):
+    parts = contents if isinstance(contents, list) else [contents]
+    # Images are represented by their size, so different images differ.
+    return "\n".join(
+        f"<image {len(part.get('data', b''))} bytes>" if isinstance(part, dict) else str(part)
+        for part in parts
+    )
+
+
+class FakeModel:
+    """
+    A local stand-in for genai.GenerativeModel.
+
+    Answers are a deterministic function of the prompt: the same prompt
+    always gets the same text, and prompts asking for JSON get a JSON object
+    with the fields the prompt names. Latency, streaming chunk size and
+    injected 429/5xx errors follow the CAREERCRAFT_FAKE_* settings.
+
+    Args:
+        model_name (str): The model being imitated.
+        generation_config (dict, optional): Default generation settings.
+    """
+
+    def __init__(self, model_name, generation_config=None, latency=None, chunk_delay=None, chunk_chars=None,
+                 response_words=None, error_rate=None, error_codes=None, seed=None):
+        self.model_name = f"fake/{model_name}"
+        self._generation_config = dict(generation_config or {})
+        self._latency = parse_latency(latency or FAKE_LATENCY)
+        self._chunk_delay = FAKE_CHUNK_DELAY if chunk_delay is None else chunk_delay
+        self._chunk_chars = chunk_chars or FAKE_CHUNK_CHARS
+        self._response_words = response_words or FAKE_RESPONSE_WORDS
+        self._error_rate = FAKE_ERROR_RATE if error_rate is None else error_rate
+        self._error_codes = error_codes or FAKE_ERROR_CODES
+        self._rng = random.Random(FAKE_SEED if seed is None else seed)
+        self._rng_lock = threading.Lock()
+
+    def _answer(self, prompt, generation_config):
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        rng = random.Random(digest)
+        words = rng.choices(_FILLER_WORDS, k=self._response_words)
+        body = " ".join(words).capitalize() + "."
+        if (generation_config or {}).get("response_mime_type") == "application/json":
+            fields = list(dict.fromkeys(_JSON_FIELD_RE.findall(prompt))) or ["text"]
+            return json.dumps({field: f"**{field}**: {body}" for field in fields})
+        return f"Response {digest.hex()[:8]}.\n\n{body}"
+
+    def _draw(self):
+        """Returns this call's latency and the injected error, if any."""
+        with self._rng_lock:
+            delay = self._latency(self._rng)
+            fail = self._rng.random() < self._error_rate
+            code = self._rng.choice(self._error_codes) if fail else None
+        error = None
+        if code is not None:
+            error = google.api_core.exceptions.from_http_status(code, "Injected by the fake backend.")
+        return max(0.0, delay), error
+
+    def _usage(self, prompt, text):
+        prompt_tokens, output_tokens = len(prompt) // 4, len(text) // 4
+        return FakeUsage(prompt_tokens, output_tokens, prompt_tokens + output_tokens)
+
+    def _chunks(self, prompt, text):
+        usage = self._usage(prompt, text)
+        for start in range(0, len(text), self._chunk_chars):
+            if start and self._chunk_delay:
+                time.sleep(self._chunk_delay)
+            yield FakeResponse(text[start:start + self._chunk_chars], usage)
+
+    def _check_timeout(self, delay, request_options):
+        """Returns how long to wait before answering, and the timeout error if it fires first."""
+        timeout = (request_options or {}).get("timeout")
+        if timeout is not None and delay > timeout:
+            return timeout, google.api_core.exceptions.DeadlineExceeded("Deadline exceeded (fake backend).")
+        return delay, None
+
+    def generate_content(self, contents, stream=False, generation_config=None, request_options=None, **kwargs):
+        """Mirrors GenerativeModel.generate_content."""
+        prompt = _prompt_text(contents)
+        delay, error = self._draw()
+        delay, timeout_error = self._check_timeout(delay, request_options)
+        time.sleep(delay)
+        error = timeout_error or error
+        if error is not None:
+            raise error
+        text = self._answer(prompt, {**self._generation_config, **(generation_config or {})})
+        if stream:
+            return self._chunks(prompt, text)
+        return FakeResponse(text, self._usage(prompt, text))
+
+    async def generate_content_async(self, contents, generation_config=None, request_options=None, **kwargs):
+        """Mirrors GenerativeModel.generate_content_async."""
+        prompt = _prompt_text(contents)
+        delay, error = self._draw()
+        delay, timeout_error = self._check_timeout(delay, request_options)
+        await asyncio.sleep(delay)
+        error = timeout_error or error
+        if error is not None:
+            raise error
+        text = self._answer(prompt, {**self._generation_config, **(generation_config or {})})
+        return FakeResponse(text, self._usage(prompt, text))
+
+
+class GeminiBackend:
+    """Creates real Gemini models through the shared client."""
+
+    requires_api_key = True
+
+    def create_model(self, api_key, model_name, generation_config=None):
+        import google.generativeai as genai
+        from gemini_client import get_client
+
+        # Configured once per key, so reruns keep the SDK's existing connection.
+        get_client().configure(api_key)
+        return genai.GenerativeModel(model_name, generation_config=generation_config)
+
+
+class FakeBackend:
+    """Creates FakeModel instances; no API key or network access needed."""
+
+    requires_api_key = False
+
+    def create_model(self, api_key, model_name, generation_config=None):
+        return FakeModel(model_name, generation_config)
+
+
+_backends = {"gemini": GeminiBackend(), "fake": FakeBackend()}
+
+
+def register_backend(name, backend):
+    """Adds a backend selectable with CAREERCRAFT_MODEL_BACKEND=name."""
+    _backends[name] = backend
+
+
+def get_backend(name=None):
+    """Returns the backend by name; defaults to CAREERCRAFT_MODEL_BACKEND."""
+    name = name or MODEL_BACKEND
+    try:
+        return _backends[name]
+    except KeyError:
+        raise ValueError(f"Unknown model backend {name!r}; expected one of {sorted(_backends)}.")
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of configured models.
+
+    Each model is created once per backend, model name and generation config,
+    then shared by every Streamlit rerun, request and thread in the process.
+    Models record their name and generation config, and the response cache
+    keys include both, so answers from one model are never served for another.
+
+    Args:
+        backend (str, optional): Backend name. Defaults to CAREERCRAFT_MODEL_BACKEND.
+        feature_models (dict, optional): Model name per feature. Defaults to
+            FEATURE_MODELS.
+    """
+
+    def __init__(self, backend=None, feature_models=None):
+        self.backend = backend or MODEL_BACKEND
+        self.feature_models = dict(FEATURE_MODELS if feature_models is None else feature_models)
+        self._api_key = None
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def configure(self, api_key):
+        """Sets the API key for new models; models created with another key are dropped."""
+        with self._lock:
+            if api_key != self._api_key:
+                self._api_key = api_key
+                self._models.clear()
+
+    def get(self, model_name=None, generation_config=None):
+        """
+        Returns the shared model, creating it on first use.
+
+        Args:
+            model_name (str, optional): Defaults to DEFAULT_MODEL.
+            generation_config (dict, optional): Default generation settings.
+        """
+        model_name = model_name or DEFAULT_MODEL
+        key = (model_name, json.dumps(generation_config or {}, sort_keys=True, default=str))
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                backend = get_backend(self.backend)
+                model = self._models[key] = backend.create_model(self._api_key, model_name, generation_config)
+            return model
+
+    def for_feature(self, feature):
+        """Returns the model configured for a feature."""
+        return self.get(self.feature_models.get(feature))
+
+    def warm_up(self):
+        """Creates the default model and every per-feature model ahead of the first request."""
+        for model_name in dict.fromkeys([DEFAULT_MODEL, *self.feature_models.values()]):
+            self.get(model_name)
+
+    def loaded(self):
+        """Returns the names of the models created so far."""
+        with self._lock:
+            return sorted({model_name for model_name, _ in self._models})
+
+
+_model_registry = None
+_model_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """Returns the process-wide model registry."""
+    global _model_registry
+    with _model_registry_lock:
+        if _model_registry is None:
+            _model_registry = ModelRegistry()
+        return _model_registry
+
+
+def set_model_registry(registry):
+    """Replaces the process-wide model registry, e.g. to switch backends in tests."""
+    global _model_registry
+    with _model_registry_lock:
+        _model_registry = registry
@@ -0,0 +1,220 @@
+import os
+import re
+import unicodedata
+from collections import Counter, namedtuple
+from functools import lru_cache
+
+# Maximum estimated tokens of resume text interpolated into a single prompt.
+RESUME_TOKEN_BUDGET = int(os.getenv("CAREERCRAFT_RESUME_TOKEN_BUDGET", "3000"))
+# Marks where a section was cut to fit the budget.
+TRUNCATION_MARKER = "[...]"
+
+# Before/after token estimates for one compaction.
+CompactionReport = namedtuple("CompactionReport", ["original_tokens", "compacted_tokens", "truncated"])
+
+# Section headings and how much each section matters to career advice.
+# Lower-priority sections are dropped first when a resume is over budget.
+_SECTION_PRIORITIES = {
+    "summary": 3, "profile": 3, "objective": 2, "about me": 2,
+    "experience": 3, "work experience": 3, "professional experience": 3, "employment": 3,
+    "employment history": 3, "internships": 3, "internship": 3,
+    "skills": 3, "technical skills": 3, "core competencies": 3,
+    "projects": 2, "education": 2, "certifications": 2, "certificates": 2,
+    "achievements": 2, "awards": 1, "publications": 1, "activities": 1,
+    "volunteering": 1, "volunteer experience": 1, "leadership": 1,
+    "languages": 1, "interests": 0, "hobbies": 0, "references": 0,
+    "declaration": 0, "personal details": 0,
+}
+_DEFAULT_SECTION_PRIORITY = 2
+
+# Lines this close to the top or bottom of a page can be running headers or footers.
+_PAGE_EDGE_LINES = 2
+
+# Explicit page labels: "Page 2", "Page 2 of 3", "2 of 3", "2/3", "- 2 -".
+# A bare number is only a page number if it is its own page's number at the
+# top or bottom of the page; elsewhere it is a year, a GPA and so on.
+_PAGE_LABEL_RE = re.compile(r"^(page\s*\d+(\s*(of|/)\s*\d+)?|\d+\s*(of|/)\s*\d+|-\s*\d+\s*-)$", re.IGNORECASE)
+# A word hyphenated across a line break, e.g. "devel-\nopment".
+_HYPHEN_BREAK_RE = re.compile(r"([\w-]*\w)-\n(?=[a-z])")
+# First halves of common compounds ("full-stack", "self-taught"), whose hyphen
+# stays when they break across lines; so does a single letter ("e-commerce").
+_COMPOUND_PREFIXES = frozenset(
+    "full self cross well real front back end high low long short non co multi semi "
+    "part open third first hands data user client server cloud cost time team detail goal fast".split()
+)
+_SPACES_RE = re.compile(r"[ \t ]+")
+_BULLETS_RE = re.compile(r"^[•●▪◦‣⁃∙*]\s*")
+
+
+def estimate_tokens(text):
+    """Estimates the token count of English text (about four characters per token)."""
+    return len(text) // 4
+
+
+def _join_hyphen_break(match):
+    word = match.group(1)
+    # Only a run of letters can be half of a split word; "2019-" (a range) and
+    # "state-of-the-" (already a compound) keep their hyphen.
+    if word.isalpha() and len(word) > 1 and word.lower() not in _COMPOUND_PREFIXES:
+        return word
+    return word + "-"
+
+
+def _edge_slots(lines):
+    """
+    Maps the index of each line near the top or bottom of a page to its slots.
+
+    A slot is the line's position counted from that edge plus its text, e.g.
+    ("top", 0, "jane doe"); a running header fills the same slot on every page.
+    """
+    slots = {}
+    for offset in range(min(_PAGE_EDGE_LINES, len(lines))):
+        for edge, index in (("top", offset), ("bottom", len(lines) - 1 - offset)):
+            slots.setdefault(index, set()).add((edge, offset, lines[index].lower()))
+    return slots
+
+
+def _normalize_lines(text):
+    """
+    Normalizes PyMuPDF text and yields cleaned, non-empty lines.
+
+    Pages are separated by form feeds, as resume_parser joins them.
+    """
+    # NFKC folds ligatures (e.g. "fi") and full-width characters into plain text.
+    text = unicodedata.normalize("NFKC", text)
+    text = _HYPHEN_BREAK_RE.sub(_join_hyphen_break, text)
+    pages = []
+    for number, page in enumerate(text.split("\f"), 1):
+        lines = [_SPACES_RE.sub(" ", line).strip() for line in page.splitlines()]
+        lines = [line for line in lines if line and not _PAGE_LABEL_RE.match(line)]
+        if lines and lines[0] == str(number):
+            lines = lines[1:]
+        if lines and lines[-1] == str(number):
+            lines = lines[:-1]
+        pages.append([_BULLETS_RE.sub("- ", line) for line in lines])
+
+    # Running headers and footers fill the same edge slot on more than one
+    # page; keep their first occurrence. Repeats elsewhere (two roles with the
+    # same title, the same bullet under two jobs) are resume content and stay.
+    page_slots = [_edge_slots(lines) for lines in pages]
+    slot_counts = Counter(slot for slots in page_slots for slot in set().union(*slots.values()))
+    seen = set()
+    for lines, slots in zip(pages, page_slots):
+        for index, line in enumerate(lines):
+            fingerprint = line.lower()
+            if any(slot_counts[slot] > 1 for slot in slots.get(index, ())):
+                if fingerprint in seen:
+                    continue
+                seen.add(fingerprint)
+            yield line
+
+
+def _section_key(line):
+    key = line.lower().rstrip(":").strip()
+    return key if key in _SECTION_PRIORITIES else None
+
+
+def _split_sections(lines):
+    """Groups lines under their headings; text before the first heading has none."""
+    sections = [[None, []]]
+    for line in lines:
+        key = _section_key(line)
+        if key is not None:
+            sections.append([line, []])
+        else:
+            sections[-1][1].append(line)
+    return [(heading, body) for heading, body in sections if heading or body]
+
+
+def _priority(heading):
+    if heading is None:
+        # Name and contact details at the top are always kept.
+        return 4
+    return _SECTION_PRIORITIES.get(_section_key(heading), _DEFAULT_SECTION_PRIORITY)
+
+
+def _render(sections):
+    blocks = []
+    for heading, body in sections:
+        blocks.append("\n".join(([heading] if heading else []) + body))
+    return "\n\n".join(blocks)
+
+
+def _fit_to_budget(sections, budget):
+    """Drops low-priority sections, then trims the rest proportionally."""
+    # 1. Drop whole sections, least important first, while over budget.
+    for priority in range(0, 2):
+        if estimate_tokens(_render(sections)) <= budget:
+            return sections
+        sections = [section for section in sections if _priority(section[0]) > priority]
+
+    if estimate_tokens(_render(sections)) <= budget:
+        return sections
+
+    # 2. Cap every section at the same size, chosen so the caps fill the
+    # budget: short sections stay whole and only the longest ones are cut.
+    # Each cut section keeps its leading lines, which carry the latest roles.
+    sizes = [sum(estimate_tokens(line) + 1 for line in body) for _, body in sections]
+    cap = _section_cap(sizes, budget)
+    trimmed = []
+    for heading, body in sections:
+        kept, used = [], 0
+        for line in body:
+            cost = estimate_tokens(line) + 1
+            if used + cost > cap:
+                kept.append(_truncate_line(line, cap - used - 1))
+                break
+            kept.append(line)
+            used += cost
+        trimmed.append((heading, kept))
+    return trimmed
+
+
+def _truncate_line(line, tokens):
+    """Cuts a line to about `tokens` tokens, at a word boundary, and marks the cut."""
+    chars = max(0, int(tokens)) * 4
+    cut = line[:chars]
+    if chars < len(line) and not line[chars].isspace() and " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return f"{cut.rstrip()} {TRUNCATION_MARKER}".lstrip()
+
+
+def _section_cap(sizes, budget):
+    """Returns the largest per-section cap whose capped sizes sum to at most budget."""
+    remaining = budget
+    ordered = sorted(sizes)
+    for index, size in enumerate(ordered):
+        cap = remaining / (len(ordered) - index)
+        if size > cap:
+            return cap
+        remaining -= size
+    return float("inf")
+
+
+@lru_cache(maxsize=64)
+def compact_resume(resume_text, budget=None):
+    """
+    Compacts resume text before it is interpolated into a prompt.
+
+    Normalizes Unicode and whitespace, rejoins hyphenated line breaks, drops
+    page numbers and header/footer lines repeated across pages, and, if the result is
+    still over budget, drops optional sections and trims the rest by section.
+
+    Args:
+        resume_text (str): The text extracted from the resume.
+        budget (int, optional): Token budget. Defaults to RESUME_TOKEN_BUDGET.
+
+    Returns:
+        tuple: The compacted text and a CompactionReport.
+    """
+    if budget is None:
+        budget = RESUME_TOKEN_BUDGET
+    sections = _split_sections(_normalize_lines(resume_text))
+    fitted = _fit_to_budget(sections, budget)
+    compacted = _render(fitted)
+    report = CompactionReport(
+        original_tokens=estimate_tokens(resume_text),
+        compacted_tokens=estimate_tokens(compacted),
+        truncated=fitted != sections,
+    )
+    return compacted, report
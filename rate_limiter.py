@@ -0,0 +1,325 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+import sqlite3
+import threading
+
+# --- Quota Settings ---
+# Limits for the shared GEMINI_API_KEY, per minute.
+REQUESTS_PER_MINUTE = int(os.getenv("CAREERCRAFT_RPM", "15"))
+TOKENS_PER_MINUTE = int(os.getenv("CAREERCRAFT_TPM", "1000000"))
+# SQLite file used to share the buckets between worker processes; leave unset
+# to limit each process on its own.
+RATE_LIMIT_DB = os.getenv("CAREERCRAFT_RATE_LIMIT_DB")
+# Longest a request may wait in the queue before giving up.
+QUEUE_TIMEOUT = float(os.getenv("CAREERCRAFT_QUEUE_TIMEOUT", "60"))
+
+# Lower numbers are served first when requests are queued.
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+FEATURE_PRIORITIES = {
+    "short_career_advice": PRIORITY_HIGH,
+    "image_caption": PRIORITY_HIGH,
+    "resume_analysis": PRIORITY_NORMAL,
+    "career_advice": PRIORITY_NORMAL,
+    "interpretable_and_fair_advice": PRIORITY_NORMAL,
+    "mock_interview": PRIORITY_NORMAL,
+    "trends_and_courses": PRIORITY_NORMAL,
+    "sdlc_project": PRIORITY_LOW,
+    "multimodal_career_advice": PRIORITY_LOW,
+    "image_generation": PRIORITY_LOW,
+}
+
+# Rough output size per feature, since TPM counts output tokens as well.
+FEATURE_OUTPUT_TOKENS = {
+    "short_career_advice": 150,
+    "image_caption": 100,
+    "sdlc_project": 2000,
+    "resume_analysis": 2000,
+}
+DEFAULT_OUTPUT_TOKENS = 800
+# Gemini bills a fixed number of tokens per inline image.
+IMAGE_TOKENS = 258
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a request waited longer than its queue timeout."""
+
+
+def estimate_tokens(feature, contents):
+    """
+    Estimates the input plus output tokens of a model call.
+
+    Args:
+        feature (str): The ai_module feature making the call.
+        contents (str | list): The prompt, or text parts and image blobs.
+
+    Returns:
+        int: The estimated token count.
+    """
+    parts = contents if isinstance(contents, list) else [contents]
+    tokens = 0
+    for part in parts:
+        if isinstance(part, dict):
+            tokens += IMAGE_TOKENS
+        else:
+            # About four characters per token for English text.
+            tokens += len(str(part)) // 4
+    return tokens + FEATURE_OUTPUT_TOKENS.get(feature, DEFAULT_OUTPUT_TOKENS)
+
+
+def _take(levels, limits, updated, now, need):
+    """
+    Refills both buckets and takes `need` from them if possible.
+
+    Returns:
+        tuple: The new levels and the wait in seconds (0.0 if taken).
+    """
+    levels = [
+        min(limit, level + (now - updated) * limit / 60.0)
+        for level, limit in zip(levels, limits)
+    ]
+    # A request larger than a whole bucket could never fit; let it drain the bucket.
+    need = [min(amount, limit) for amount, limit in zip(need, limits)]
+    if all(level >= amount for level, amount in zip(levels, need)):
+        return [level - amount for level, amount in zip(levels, need)], 0.0
+    wait = max(
+        (amount - level) * 60.0 / limit
+        for level, amount, limit in zip(levels, need, limits)
+        if level < amount
+    )
+    return levels, wait
+
+
+class MemoryBuckets:
+    """Request and token buckets held in this process."""
+
+    def __init__(self, rpm, tpm):
+        self.limits = (rpm, tpm)
+        self._levels = [float(rpm), float(tpm)]
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_consume(self, tokens):
+        """Takes one request and `tokens` tokens; returns the wait if they are unavailable."""
+        with self._lock:
+            now = time.monotonic()
+            self._levels, wait = _take(self._levels, self.limits, self._updated, now, (1, tokens))
+            self._updated = now
+            return wait
+
+
+class SQLiteBuckets:
+    """Request and token buckets shared by every process using the same file."""
+
+    def __init__(self, path, rpm, tpm):
+        self.path = path
+        self.limits = (rpm, tpm)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets "
+                "(id INTEGER PRIMARY KEY CHECK (id = 0), requests REAL, tokens REAL, updated REAL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO buckets VALUES (0, ?, ?, ?)", (rpm, tpm, time.time())
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def try_consume(self, tokens):
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE takes the write lock up front, so the read-refill-
+            # write below is atomic across processes.
+            conn.execute("BEGIN IMMEDIATE")
+            requests_level, tokens_level, updated = conn.execute(
+                "SELECT requests, tokens, updated FROM buckets WHERE id = 0"
+            ).fetchone()
+            now = time.time()
+            levels, wait = _take([requests_level, tokens_level], self.limits, updated, now, (1, tokens))
+            conn.execute(
+                "UPDATE buckets SET requests = ?, tokens = ?, updated = ? WHERE id = 0",
+                (levels[0], levels[1], now),
+            )
+            conn.execute("COMMIT")
+            return wait
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter over requests and tokens per minute, with a priority queue.
+
+    Waiting requests are served strictly by (priority, arrival order): only
+    the request at the head of the queue may take from the buckets, so a
+    burst of long, low-priority calls cannot starve cheap high-priority ones.
+    Threads and coroutines wait in the same queue; coroutines wait on their
+    event loop, not in a worker thread.
+
+    Args:
+        buckets: A MemoryBuckets or SQLiteBuckets instance.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self._cond = threading.Condition()
+        self._waiters = []
+        # Queue entry -> (event loop, asyncio.Event) for each waiting coroutine.
+        self._async_waiters = {}
+        self._sequence = itertools.count()
+        self._stats = {"acquired": 0, "queued": 0, "timeouts": 0, "total_wait": 0.0}
+
+    def acquire(self, tokens, priority=PRIORITY_NORMAL, timeout=QUEUE_TIMEOUT):
+        """
+        Blocks until the request may be sent.
+
+        Args:
+            tokens (int): Estimated tokens for the request.
+            priority (int): Queue priority; lower is served first.
+            timeout (float): Maximum wait in seconds.
+
+        Raises:
+            RateLimitTimeout: If the request could not be admitted in time.
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+        entry = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            # A newcomer may now be at the head; let the current head re-check.
+            self._notify()
+            waited = False
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if self._waiters[0] == entry:
+                        wait = self.buckets.try_consume(tokens)
+                        if wait == 0.0:
+                            heapq.heappop(self._waiters)
+                            self._record(started, waited)
+                            return
+                    else:
+                        wait = remaining
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise RateLimitTimeout(
+                            f"Request was not admitted within {timeout:g}s by the rate limiter."
+                        )
+                    waited = True
+                    self._cond.wait(min(wait, remaining))
+            finally:
+                self._leave(entry)
+
+    async def aacquire(self, tokens, priority=PRIORITY_NORMAL, timeout=QUEUE_TIMEOUT):
+        """Async counterpart of acquire(); waits on the event loop without holding a thread."""
+        started = time.monotonic()
+        deadline = started + timeout
+        entry = (priority, next(self._sequence))
+        wake = asyncio.Event()
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            self._async_waiters[entry] = (asyncio.get_running_loop(), wake)
+            self._notify()
+        waited = False
+        try:
+            while True:
+                with self._cond:
+                    # Cleared under the lock, so a release after this check still wakes us.
+                    wake.clear()
+                    remaining = deadline - time.monotonic()
+                    if self._waiters[0] == entry:
+                        wait = self.buckets.try_consume(tokens)
+                        if wait == 0.0:
+                            heapq.heappop(self._waiters)
+                            self._record(started, waited)
+                            return
+                    else:
+                        wait = remaining
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise RateLimitTimeout(
+                            f"Request was not admitted within {timeout:g}s by the rate limiter."
+                        )
+                waited = True
+                try:
+                    await asyncio.wait_for(wake.wait(), min(wait, remaining))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._cond:
+                del self._async_waiters[entry]
+                self._leave(entry)
+
+    def _leave(self, entry):
+        """Drops entry from the queue if still there and wakes the rest; call with the lock held."""
+        if entry in self._waiters:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+        self._notify()
+
+    def _notify(self):
+        """Wakes every waiting thread and coroutine; call with the lock held."""
+        self._cond.notify_all()
+        for loop, wake in self._async_waiters.values():
+            loop.call_soon_threadsafe(wake.set)
+
+    def _record(self, started, waited):
+        self._stats["acquired"] += 1
+        if waited:
+            self._stats["queued"] += 1
+        self._stats["total_wait"] += time.monotonic() - started
+
+    def stats(self):
+        """Returns admitted, queued and timed-out request counts and total wait time."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["waiting"] = len(self._waiters)
+        return stats
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    Returns the process-wide rate limiter.
+
+    The buckets are shared through SQLite when CAREERCRAFT_RATE_LIMIT_DB is
+    set, so all workers behind the same API key draw from one quota.
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            if RATE_LIMIT_DB:
+                buckets = SQLiteBuckets(RATE_LIMIT_DB, REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE)
+            else:
+                buckets = MemoryBuckets(REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE)
+            _rate_limiter = RateLimiter(buckets)
+        return _rate_limiter
+
+
+def admit(feature, contents):
+    """Waits for quota for one call of the given feature."""
+    priority = FEATURE_PRIORITIES.get(feature, PRIORITY_NORMAL)
+    get_rate_limiter().acquire(estimate_tokens(feature, contents), priority)
+
+
+async def aadmit(feature, contents):
+    """Async counterpart of admit()."""
+    priority = FEATURE_PRIORITIES.get(feature, PRIORITY_NORMAL)
+    await get_rate_limiter().aacquire(estimate_tokens(feature, contents), priority)
@@ -0,0 +1,323 @@
+import os
+import re
+import time
+import random
+import asyncio
+import sys
+import threading
+import google.api_core.exceptions
+
+# --- Retry Settings ---
+MAX_ATTEMPTS = int(os.getenv("CAREERCRAFT_MAX_ATTEMPTS", "4"))
+BASE_DELAY = 0.5
+MAX_DELAY = 8.0
+# Overall budget for one request's retries and backoff waits: no attempt starts
+# after it. Each attempt's own timeout is set by the caller (see gemini_client).
+REQUEST_DEADLINE = float(os.getenv("CAREERCRAFT_REQUEST_DEADLINE", "30"))
+
+# --- Circuit Breaker Settings ---
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 30.0
+
+_RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+_RETRYABLE_API_ERRORS = (
+    google.api_core.exceptions.ResourceExhausted,
+    google.api_core.exceptions.ServiceUnavailable,
+    google.api_core.exceptions.InternalServerError,
+    google.api_core.exceptions.DeadlineExceeded,
+    google.api_core.exceptions.TooManyRequests,
+)
+_RETRY_HINT_PATTERNS = (
+    re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)"),
+    re.compile(r"retry in ([\d.]+)\s*s", re.IGNORECASE),
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the model while the circuit breaker is open."""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(
+            f"The AI service is temporarily unavailable after repeated failures. "
+            f"Please try again in {retry_after:.0f} seconds."
+        )
+
+
+def _is_quota_error(exc):
+    if isinstance(exc, (google.api_core.exceptions.ResourceExhausted, google.api_core.exceptions.TooManyRequests)):
+        return True
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+def is_retryable(exc):
+    """Returns True for rate-limit, server-side and transient network errors."""
+    if isinstance(exc, _RETRYABLE_API_ERRORS):
+        return True
+    # requests is only loaded once a REST call is made; until then, no error can come from it.
+    requests = sys.modules.get("requests")
+    if requests is None:
+        return False
+    if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(exc, requests.exceptions.HTTPError):
+        return getattr(exc.response, "status_code", None) in _RETRYABLE_STATUS_CODES
+    return False
+
+
+def retry_hint(exc):
+    """
+    Returns the server-requested wait before retrying, in seconds, if any.
+
+    Checks an HTTP Retry-After header, RetryInfo details on Google API errors
+    and, as a last resort, the retry delay quoted in the error message.
+    """
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    if "Retry-After" in headers:
+        try:
+            return float(headers["Retry-After"])
+        except ValueError:
+            pass
+
+    for detail in getattr(exc, "details", None) or []:
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None and hasattr(delay, "seconds"):
+            return delay.seconds + getattr(delay, "nanos", 0) / 1e9
+
+    message = str(exc)
+    for pattern in _RETRY_HINT_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+class CircuitBreaker:
+    """
+    Stops calling the model after repeated failures or an exhausted quota.
+
+    While open, calls fail immediately with CircuitOpenError. After the
+    cooldown a single trial request is let through, retries included:
+    success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._open_until = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self, trial=False):
+        """
+        Raises CircuitOpenError if the call should not be attempted.
+
+        Args:
+            trial (bool): True for a retry of the request holding the trial slot.
+
+        Returns:
+            bool: True if this request holds the trial slot.
+        """
+        with self._lock:
+            if trial and self._trial_in_flight:
+                return True
+            now = time.monotonic()
+            if now < self._open_until:
+                raise CircuitOpenError(self._open_until - now)
+            if self._open_until:
+                # Cooldown over: allow exactly one trial request through.
+                if self._trial_in_flight:
+                    raise CircuitOpenError(self.reset_timeout)
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._open_until = 0.0
+            self._trial_in_flight = False
+
+    def record_failure(self, exc, hint=None, trial=False):
+        """Records a retryable failure; returns True if this opened the circuit."""
+        with self._lock:
+            self._failures += 1
+            if trial:
+                self._trial_in_flight = False
+            if trial or self._failures >= self.failure_threshold or _is_quota_error(exc):
+                # A quota error is only recorded once retries are exhausted, so it
+                # opens the circuit straight away instead of burning more calls.
+                self._open_until = time.monotonic() + max(self.reset_timeout, hint or 0.0)
+                return True
+            return False
+
+    def release_trial(self):
+        """Releases the trial slot after a non-retryable error or cancellation."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff bounded by an overall deadline.
+
+    Args:
+        max_attempts (int): Attempts per request, including the first.
+        base_delay (float): Backoff before the first retry, in seconds.
+        max_delay (float): Cap on a single backoff, in seconds.
+        deadline (float): Seconds after the first attempt within which retries
+            may start.
+    """
+
+    def __init__(self, max_attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY, max_delay=MAX_DELAY,
+                 deadline=REQUEST_DEADLINE):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def backoff(self, attempt, hint=None):
+        """Returns the wait before retry number `attempt` (1-based)."""
+        # "Full jitter": a random wait up to the exponential ceiling, so clients
+        # that failed together do not retry in lockstep.
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if hint is not None:
+            delay = max(delay, hint)
+        return delay
+
+
+class ResilientCaller:
+    """
+    Runs model calls with retries, a per-request deadline and a circuit breaker.
+
+    The wrapped function is called with a `deadline` keyword, the
+    time.monotonic() value after which no new attempt starts, and should
+    bound any local wait before its attempt (such as for a concurrency slot)
+    by it. The attempt itself has its own timeout. Every path is counted;
+    see stats().
+    """
+
+    def __init__(self, policy=None, breaker=None):
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self._lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "successes": 0,
+            "retries": 0,
+            "retry_hints_honored": 0,
+            "deadline_exceeded": 0,
+            "circuit_opened": 0,
+            "short_circuited": 0,
+            "failures": 0,
+        }
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        """Returns how often each resilience path has fired."""
+        with self._lock:
+            return dict(self._stats)
+
+    def _next_delay(self, exc, attempt, started, trial):
+        """
+        Decides whether to retry after exc.
+
+        Returns:
+            float | None: Seconds to wait, or None to give up and re-raise.
+        """
+        if not is_retryable(exc):
+            if trial:
+                self.breaker.release_trial()
+            return None
+
+        hint = retry_hint(exc)
+        if attempt >= self.policy.max_attempts:
+            if self.breaker.record_failure(exc, hint, trial):
+                self._count("circuit_opened")
+            return None
+
+        delay = self.policy.backoff(attempt, hint)
+        if time.monotonic() - started + delay > self.policy.deadline:
+            # Waiting would overrun the request deadline; fail now instead.
+            self._count("deadline_exceeded")
+            if self.breaker.record_failure(exc, hint, trial):
+                self._count("circuit_opened")
+            return None
+
+        if hint is not None:
+            self._count("retry_hints_honored")
+        self._count("retries")
+        return delay
+
+    def _before_attempt(self, trial):
+        try:
+            return self.breaker.before_call(trial)
+        except CircuitOpenError:
+            self._count("short_circuited")
+            raise
+
+    def call(self, func, *args, **kwargs):
+        """Calls func(*args, **kwargs), retrying transient failures."""
+        self._count("calls")
+        started = time.monotonic()
+        deadline = started + self.policy.deadline
+        attempt = 0
+        trial = False
+        try:
+            while True:
+                attempt += 1
+                trial = self._before_attempt(trial)
+                try:
+                    result = func(*args, deadline=deadline, **kwargs)
+                except Exception as exc:
+                    delay = self._next_delay(exc, attempt, started, trial)
+                    if delay is None:
+                        self._count("failures")
+                        trial = False  # _next_delay settled the trial slot
+                        raise
+                    time.sleep(delay)
+                    continue
+                self.breaker.record_success()
+                self._count("successes")
+                trial = False
+                return result
+        finally:
+            if trial:
+                # Interrupted mid-request; nothing was learned about the service.
+                self.breaker.release_trial()
+
+    async def acall(self, func, *args, **kwargs):
+        """Awaits func(*args, **kwargs), backing off without blocking the event loop."""
+        self._count("calls")
+        started = time.monotonic()
+        deadline = started + self.policy.deadline
+        attempt = 0
+        trial = False
+        try:
+            while True:
+                attempt += 1
+                trial = self._before_attempt(trial)
+                try:
+                    result = await func(*args, deadline=deadline, **kwargs)
+                except Exception as exc:
+                    delay = self._next_delay(exc, attempt, started, trial)
+                    if delay is None:
+                        self._count("failures")
+                        trial = False  # _next_delay settled the trial slot
+                        raise
+                    await asyncio.sleep(delay)
+                    continue
+                self.breaker.record_success()
+                self._count("successes")
+                trial = False
+                return result
+        finally:
+            if trial:
+                # Cancelled mid-request; nothing was learned about the service.
+                self.breaker.release_trial()
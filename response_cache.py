@@ -0,0 +1,284 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# --- Response Cache Settings ---
+# Path of a shared SQLite cache file; leave unset to cache in memory only.
+RESPONSE_CACHE_PATH = os.getenv("CAREERCRAFT_RESPONSE_CACHE")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("CAREERCRAFT_RESPONSE_CACHE_ENTRIES", "5000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("CAREERCRAFT_RESPONSE_CACHE_BYTES", str(256 * 1024 * 1024)))
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# Time-to-live per feature, in seconds. None means the entry never expires and
+# is only removed by LRU eviction. Trends go stale quickly; interview questions
+# and plans for a given topic do not.
+FEATURE_TTLS = {
+    "trends_and_courses": 6 * HOUR,
+    "mock_interview": None,
+    "sdlc_project": None,
+    "image_caption": 30 * DAY,
+}
+DEFAULT_TTL = 7 * DAY
+
+
+def _normalize_text(text):
+    """Collapses whitespace so cosmetic prompt differences share a key."""
+    return " ".join(str(text).split())
+
+
+def make_key(contents, model_name="", generation_config=None):
+    """
+    Builds a cache key from the prompt, model name and generation config.
+
+    Args:
+        contents (str | list): The prompt, or a list of text parts and inline
+            image blobs ({"mime_type", "data"}).
+        model_name (str): The name of the model that will answer the prompt.
+        generation_config (dict, optional): Generation settings for the call.
+
+    Returns:
+        str: A hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps(generation_config or {}, sort_keys=True, default=str).encode("utf-8"))
+    parts = contents if isinstance(contents, list) else [contents]
+    for part in parts:
+        digest.update(b"\0")
+        if isinstance(part, dict):
+            digest.update(part["mime_type"].encode("utf-8"))
+            digest.update(part["data"])
+        else:
+            digest.update(_normalize_text(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class MemoryBackend:
+    """An in-process LRU bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= now:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at)
+            self._bytes += len(value.encode("utf-8"))
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value.encode("utf-8"))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def size(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
+
+
+class SQLiteBackend:
+    """
+    A disk cache shared by every process that points at the same file.
+
+    Entries are evicted least-recently-used once the entry or byte cap is
+    exceeded; expired entries are dropped when they are read.
+    """
+
+    def __init__(self, path, max_entries=RESPONSE_CACHE_MAX_ENTRIES, max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per operation keeps the backend safe to use
+        # from Streamlit's script threads and from several worker processes.
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key, now):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key, value, expires_at):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), expires_at, now),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Walk entries from least to most recently used until both caps hold.
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def size(self):
+        with self._connect() as conn:
+            count, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"entries": count, "bytes": total}
+
+
+class ResponseCache:
+    """
+    Caches completed model answers with per-feature TTLs and hit statistics.
+
+    Args:
+        backend: A MemoryBackend, SQLiteBackend or any object with the same
+            get/set/clear/size methods.
+        ttls (dict, optional): Per-feature TTLs in seconds. Defaults to FEATURE_TTLS.
+        default_ttl (float, optional): TTL for features not listed in ttls.
+    """
+
+    def __init__(self, backend, ttls=None, default_ttl=DEFAULT_TTL):
+        self.backend = backend
+        self.ttls = FEATURE_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "bytes_saved": 0}
+
+    def get(self, feature, key):
+        """Returns the cached answer for key, or None on a miss."""
+        value = self.backend.get(key, time.time())
+        with self._lock:
+            if value is None:
+                self._stats["misses"] += 1
+            else:
+                self._stats["hits"] += 1
+                self._stats["bytes_saved"] += len(value.encode("utf-8"))
+        return value
+
+    def set(self, feature, key, value):
+        """Stores a completed answer using the feature's TTL."""
+        ttl = self.ttls.get(feature, self.default_ttl)
+        expires_at = None if ttl is None else time.time() + ttl
+        self.backend.set(key, value, expires_at)
+
+    def clear(self):
+        self.backend.clear()
+        with self._lock:
+            for counter in self._stats:
+                self._stats[counter] = 0
+
+    def stats(self):
+        """
+        Returns hit/miss counters, the hit ratio, bytes saved and cache size.
+
+        Returns:
+            dict: The cache statistics.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats.update(self.backend.size())
+        return stats
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Returns the process-wide response cache.
+
+    The backend is SQLite when CAREERCRAFT_RESPONSE_CACHE names a file, so
+    every replica pointing at that file shares answers; otherwise it is an
+    in-memory LRU.
+    """
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            if RESPONSE_CACHE_PATH:
+                backend = SQLiteBackend(RESPONSE_CACHE_PATH)
+            else:
+                backend = MemoryBackend()
+            _response_cache = ResponseCache(backend)
+        return _response_cache
+
+
+def set_response_cache(cache):
+    """Replaces the process-wide response cache, e.g. with a custom backend."""
+    global _response_cache
+    with _response_cache_lock:
+        _response_cache = cache
@@ -1,6 +1,299 @@
-import fitz # PyMuPDF
 import io
-from PIL import Image
+import os
+import re
+import hashlib
+import pickle
+import threading
+from collections import Counter, OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from metrics import inc, span, timed
+
+# A single parsed page, as yielded by iter_pdf_pages().
+PageContent = namedtuple("PageContent", ["number", "page_count", "text", "images"])
+# An embedded image with the metadata needed to budget model payloads.
+ExtractedImage = namedtuple(
+    "ExtractedImage", ["page", "xref", "width", "height", "ext", "digest", "data"]
+)
+
+# Images smaller than this many pixels (bullets, icons, rules) are skipped.
+MIN_IMAGE_AREA = int(os.getenv("CAREERCRAFT_MIN_IMAGE_AREA", "4096"))
+
+# --- Page-Parallel Extraction ---
+# Number of worker processes used for large documents; 0 or 1 parses inline.
+PDF_WORKERS = int(os.getenv("CAREERCRAFT_PDF_WORKERS", "0"))
+# Documents shorter than this are always parsed inline, since starting work in
+# another process costs more than parsing a short resume.
+PARALLEL_MIN_PAGES = 8
+
+_process_pool = None
+_process_pool_workers = 0
+_process_pool_lock = threading.Lock()
+
+# --- Parse Cache ---
+# Parsed resumes are keyed by a SHA-256 digest of the PDF bytes, so a Streamlit
+# rerun (or a re-upload of the same file) only costs a hash lookup.
+PARSE_CACHE_MAX_ENTRIES = int(os.getenv("CAREERCRAFT_PARSE_CACHE_SIZE", "32"))
+# Optional on-disk tier; leave unset to keep the cache in memory only. Entries
+# are pickles and are unpickled on read, so the directory must not be writable
+# by anyone you would not let run code in this process.
+PARSE_CACHE_DIR = os.getenv("CAREERCRAFT_PARSE_CACHE_DIR")
+# Size budget for the on-disk tier; the least recently used files go first.
+PARSE_CACHE_MAX_BYTES = int(os.getenv("CAREERCRAFT_PARSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+_parse_cache = OrderedDict()
+_parse_cache_lock = threading.Lock()
+_parse_cache_stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+
+def _open_pdf(pdf_bytes):
+    """Opens a PDF with PyMuPDF, which is imported on the first upload rather than at startup."""
+    import fitz  # PyMuPDF
+
+    return fitz.open(stream=pdf_bytes, filetype="pdf")
+
+
+def _pdf_digest(pdf_bytes):
+    """Returns the hex SHA-256 digest used as the parse cache key."""
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def _disk_cache_path(key):
+    return os.path.join(PARSE_CACHE_DIR, f"{key}.pkl")
+
+
+def _cache_get(key):
+    """
+    Looks up a parsed result in memory first and then on disk.
+
+    Returns:
+        The cached value, or None on a miss.
+    """
+    with _parse_cache_lock:
+        if key in _parse_cache:
+            _parse_cache.move_to_end(key)
+            _parse_cache_stats["hits"] += 1
+            inc("cache_requests_total", cache="parse", result="hit")
+            return _parse_cache[key]
+
+    if PARSE_CACHE_DIR:
+        try:
+            with open(_disk_cache_path(key), "rb") as f:
+                value = pickle.load(f)
+            # Bump the mtime so eviction drops the least recently used files.
+            os.utime(_disk_cache_path(key))
+        except FileNotFoundError:
+            value = None
+        except Exception:
+            # A truncated pickle, or one from an older version of this code,
+            # can fail to load in many ways; drop it and parse again.
+            value = None
+            try:
+                os.remove(_disk_cache_path(key))
+            except OSError:
+                pass
+        if value is not None:
+            with _parse_cache_lock:
+                _parse_cache_stats["disk_hits"] += 1
+            inc("cache_requests_total", cache="parse", result="disk_hit")
+            _cache_put(key, value, persist=False)
+            return value
+
+    with _parse_cache_lock:
+        _parse_cache_stats["misses"] += 1
+    inc("cache_requests_total", cache="parse", result="miss")
+    return None
+
+
+def _cache_put(key, value, persist=True):
+    """Stores a parsed result in the in-memory LRU and, optionally, on disk."""
+    with _parse_cache_lock:
+        _parse_cache[key] = value
+        _parse_cache.move_to_end(key)
+        while len(_parse_cache) > PARSE_CACHE_MAX_ENTRIES:
+            _parse_cache.popitem(last=False)
+
+    if persist and PARSE_CACHE_DIR:
+        try:
+            os.makedirs(PARSE_CACHE_DIR, exist_ok=True)
+            # Write to a temporary file first so readers never see a partial pickle.
+            tmp_path = _disk_cache_path(key) + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, _disk_cache_path(key))
+            _prune_disk_cache()
+        except OSError:
+            # The disk tier is best effort; the in-memory copy is still valid.
+            pass
+
+
+def _prune_disk_cache():
+    """Deletes the oldest cache files by mtime until the directory fits PARSE_CACHE_MAX_BYTES."""
+    entries = []
+    with os.scandir(PARSE_CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".pkl"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # evicted by another process
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= PARSE_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def get_parse_cache_stats():
+    """
+    Returns the parse cache counters.
+
+    Returns:
+        dict: Hit, disk-hit and miss counters plus the current in-memory size.
+    """
+    with _parse_cache_lock:
+        stats = dict(_parse_cache_stats)
+        stats["entries"] = len(_parse_cache)
+    return stats
+
+
+def clear_parse_cache():
+    """Empties the in-memory parse cache and resets its counters."""
+    with _parse_cache_lock:
+        _parse_cache.clear()
+        for counter in _parse_cache_stats:
+            _parse_cache_stats[counter] = 0
+
+
+def _extract_page(doc, page, seen_xrefs, min_image_area):
+    """
+    Extracts the text and embedded images of a single PyMuPDF page.
+
+    Images whose xref is already in seen_xrefs are skipped before decoding, as
+    are images below min_image_area pixels; seen_xrefs is updated in place.
+    """
+    images = []
+    with span("resume_parser.extract_images"):
+        for img in page.get_images(full=True):
+            xref, width, height = img[0], img[2], img[3]
+            if xref in seen_xrefs:
+                continue
+            seen_xrefs.add(xref)
+            if width * height < min_image_area:
+                continue
+
+            base_image = doc.extract_image(xref)
+            image_bytes = base_image["image"]
+            images.append(ExtractedImage(
+                page=page.number,
+                xref=xref,
+                width=base_image.get("width", width),
+                height=base_image.get("height", height),
+                ext=base_image.get("ext", ""),
+                digest=hashlib.sha256(image_bytes).hexdigest(),
+                data=image_bytes,
+            ))
+    with span("resume_parser.extract_text"):
+        text = page.get_text()
+    return PageContent(page.number, doc.page_count, text, images)
+
+
+def _extract_page_range(pdf_bytes, start, stop, min_image_area):
+    """
+    Worker entry point: opens the document and parses pages [start, stop).
+
+    Each worker opens its own copy of the document, so no PyMuPDF objects are
+    shared across processes. Images are deduplicated by xref within the range;
+    the caller deduplicates across ranges.
+    """
+    seen_xrefs = set()
+    with _open_pdf(pdf_bytes) as doc:
+        return [
+            _extract_page(doc, doc[number], seen_xrefs, min_image_area)
+            for number in range(start, stop)
+        ]
+
+
+def _get_process_pool(workers):
+    """Returns a process-wide pool, recreating it only if the size changes."""
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_workers != workers:
+            if _process_pool is not None:
+                _process_pool.shutdown(wait=False)
+            _process_pool = ProcessPoolExecutor(max_workers=workers)
+            _process_pool_workers = workers
+        return _process_pool
+
+
+def _iter_raw_pages(pdf_bytes, workers, min_image_area):
+    """Yields PageContent in page order, inline or from the process pool."""
+    seen_xrefs = set()
+    with span("resume_parser.pdf_open"):
+        doc = _open_pdf(pdf_bytes)
+    with doc:
+        page_count = doc.page_count
+        if workers <= 1 or page_count < PARALLEL_MIN_PAGES:
+            for page in doc:
+                yield _extract_page(doc, page, seen_xrefs, min_image_area)
+            return
+
+    pool = _get_process_pool(workers)
+    chunk_size = -(-page_count // workers)  # ceiling division
+    futures = [
+        pool.submit(
+            _extract_page_range, pdf_bytes, start, min(start + chunk_size, page_count), min_image_area
+        )
+        for start in range(0, page_count, chunk_size)
+    ]
+    for future in futures:
+        for page in future.result():
+            yield page
+
+
+def iter_pdf_pages(pdf_bytes, workers=None, min_image_area=None):
+    """
+    Yields the pages of a PDF one at a time, in page order.
+
+    With more than one worker, large documents are split into contiguous page
+    ranges that are parsed in a process pool; pages are still yielded in
+    order as soon as their range is finished.
+
+    Each embedded image is returned once: repeats of the same xref (logos,
+    header graphics) and byte-identical images stored under different xrefs
+    are dropped, as are images smaller than min_image_area pixels.
+
+    Args:
+        pdf_bytes (bytes): The raw PDF document.
+        workers (int, optional): Number of worker processes. Defaults to
+            PDF_WORKERS.
+        min_image_area (int, optional): Smallest image, in pixels, to keep.
+            Defaults to MIN_IMAGE_AREA.
+
+    Yields:
+        PageContent: The page number, page count, text and ExtractedImage list.
+    """
+    if workers is None:
+        workers = PDF_WORKERS
+    if min_image_area is None:
+        min_image_area = MIN_IMAGE_AREA
+
+    seen_xrefs = set()
+    seen_digests = set()
+    for page in _iter_raw_pages(pdf_bytes, workers, min_image_area):
+        unique_images = []
+        for image in page.images:
+            if image.xref in seen_xrefs or image.digest in seen_digests:
+                continue
+            seen_xrefs.add(image.xref)
+            seen_digests.add(image.digest)
+            unique_images.append(image)
+        yield page._replace(images=unique_images)
+
 
 def extract_text_from_pdf(file):
     """
@@ -12,44 +305,262 @@ def extract_text_from_pdf(file):
     Returns:
         str: A string containing the text extracted from the PDF.
     """
-    # Reset file pointer to the beginning for reading
-    file.seek(0)
-    
-    text = ""
-    with fitz.open(stream=file.read(), filetype="pdf") as doc:
-        for page in doc:
-            text += page.get_text()
+    text, _ = extract_text_and_images_from_pdf(file)
     return text
 
-def extract_text_and_images_from_pdf(file):
+@timed("resume_parser.extract_resume_content")
+def extract_resume_content(file, on_page=None, workers=None, min_image_area=None):
     """
-    Extracts text and all images from a PDF file.
+    Extracts text and unique embedded images, with metadata, from a PDF file.
+
+    Results are cached by a hash of the PDF bytes, so repeated calls with the
+    same document skip PyMuPDF entirely.
 
     Args:
         file (UploadedFile): The PDF file uploaded via Streamlit.
+        on_page (callable, optional): Called with each PageContent as it is
+            parsed, e.g. to render a progressive preview. Not called on a
+            cache hit.
+        workers (int, optional): Number of worker processes for large documents.
+        min_image_area (int, optional): Smallest image, in pixels, to keep.
 
     Returns:
-        tuple: A tuple containing a string of text and a list of image bytes.
+        tuple: A string of text and a list of ExtractedImage records.
     """
+    if min_image_area is None:
+        min_image_area = MIN_IMAGE_AREA
+
     # Reset file pointer to the beginning for reading
     file.seek(0)
-    
-    text = ""
+    pdf_bytes = file.read()
+
+    key = f"{_pdf_digest(pdf_bytes)}-{min_image_area}"
+    cached = _cache_get(key)
+    if cached is not None:
+        text, images = cached
+        return text, list(images)
+
+    # Collect page texts and join once, instead of repeated string concatenation.
+    text_parts = []
     images = []
-    
-    with fitz.open(stream=file.read(), filetype="pdf") as doc:
-        for page in doc:
-            # Extract text from the page
-            text += page.get_text()
-            
-            # Extract image data as bytes
-            for img in page.get_images(full=True):
-                xref = img[0]
-                base_image = doc.extract_image(xref)
-                image_bytes = base_image["image"]
-                
-                # Append the raw image bytes to the list
-                images.append(image_bytes)
-                
+    for page in iter_pdf_pages(pdf_bytes, workers=workers, min_image_area=min_image_area):
+        text_parts.append(page.text)
+        images.extend(page.images)
+        if on_page is not None:
+            on_page(page)
+
+    # A form feed between pages, as pdftotext does, so later steps can tell
+    # page headers and footers from body text.
+    text = "\f".join(text_parts)
+    _cache_put(key, (text, tuple(images)))
     return text, images
 
+def extract_text_and_images_from_pdf(file, on_page=None, workers=None):
+    """
+    Extracts text and all unique images from a PDF file.
+
+    Args:
+        file (UploadedFile): The PDF file uploaded via Streamlit.
+        on_page (callable, optional): Called with each PageContent as it is parsed.
+        workers (int, optional): Number of worker processes for large documents.
+
+    Returns:
+        tuple: A tuple containing a string of text and a list of image bytes.
+    """
+    text, images = extract_resume_content(file, on_page=on_page, workers=workers)
+    return text, [image.data for image in images]
+
+
+# --- Structured Sections ---
+# Section names, in the order they are rendered back into prompt text.
+SECTION_NAMES = ("summary", "experience", "education", "skills", "projects", "other")
+
+# A resume split into sections; "header" holds the name and contact lines
+# above the first heading, and skills_set the normalized skill names.
+ResumeSections = namedtuple(
+    "ResumeSections", ("header",) + SECTION_NAMES + ("skills_set",)
+)
+
+_SECTION_ALIASES = {
+    "summary": "summary", "profile": "summary", "objective": "summary",
+    "career objective": "summary", "about me": "summary", "professional summary": "summary",
+    "experience": "experience", "work experience": "experience",
+    "professional experience": "experience", "employment": "experience",
+    "employment history": "experience", "work history": "experience",
+    "internships": "experience", "internship": "experience",
+    "education": "education", "academic background": "education",
+    "academic qualifications": "education", "qualifications": "education",
+    "skills": "skills", "technical skills": "skills", "key skills": "skills",
+    "core competencies": "skills", "technologies": "skills", "tools": "skills",
+    "projects": "projects", "personal projects": "projects",
+    "academic projects": "projects", "key projects": "projects",
+}
+
+# Common spellings folded onto one canonical skill name.
+_SKILL_ALIASES = {
+    "js": "javascript", "ts": "typescript", "py": "python", "golang": "go",
+    "k8s": "kubernetes", "postgres": "postgresql", "nodejs": "node.js", "node": "node.js",
+    "reactjs": "react", "react.js": "react", "ml": "machine learning",
+    "dl": "deep learning", "nlp": "natural language processing",
+    "amazon web services": "aws", "google cloud": "gcp", "c sharp": "c#",
+}
+
+_HEADING_KEY_RE = re.compile(r"[^a-z& ]")
+# "/" is left alone so skills like "CI/CD" and "TCP/IP" stay whole.
+_SKILL_SPLIT_RE = re.compile(r"[,;|•·●▪]| {2,}|\t")
+# PyMuPDF span flag for bold text.
+_BOLD_FLAG = 16
+# Unknown headings must be this much larger than body text to start a section.
+_HEADING_SIZE_RATIO = 1.2
+
+_StyledLine = namedtuple("_StyledLine", ["text", "size", "bold"])
+
+
+def _iter_styled_lines(doc):
+    """Yields every non-empty text line with its largest font size and boldness."""
+    for page in doc:
+        for block in page.get_text("dict")["blocks"]:
+            if block.get("type") != 0:
+                continue
+            for line in block["lines"]:
+                spans = [span for span in line["spans"] if span["text"].strip()]
+                if not spans:
+                    continue
+                yield _StyledLine(
+                    text=" ".join("".join(span["text"] for span in spans).split()),
+                    size=max(span["size"] for span in spans),
+                    bold=all(
+                        span["flags"] & _BOLD_FLAG or "bold" in span["font"].lower()
+                        for span in spans
+                    ),
+                )
+
+
+def _body_font_size(lines):
+    """Returns the font size covering the most characters."""
+    sizes = Counter()
+    for line in lines:
+        sizes[round(line.size, 1)] += len(line.text)
+    return sizes.most_common(1)[0][0] if sizes else 0.0
+
+
+def _emphasized(line, body_size):
+    return line.bold or line.size >= body_size * 1.1 or line.text.isupper()
+
+
+def _classify_heading(line, body_size, styled):
+    """
+    Returns the section a line opens, or None for ordinary text.
+
+    Known headings ("Work Experience", "SKILLS:") must stand out from body
+    text by weight, size or capitals; in single-style documents the wording
+    alone is enough. Other short lines set well above body size open an
+    "other" section (e.g. "Certifications", "Awards").
+    """
+    key = " ".join(_HEADING_KEY_RE.sub(" ", line.text.lower()).split())
+    section = _SECTION_ALIASES.get(key)
+    if section is not None and (_emphasized(line, body_size) or not styled):
+        return section
+    if line.size >= body_size * _HEADING_SIZE_RATIO and len(key.split()) <= 4:
+        return "other"
+    return None
+
+
+def normalize_skills(skills_text):
+    """
+    Turns the text of a skills section into a set of normalized skill names.
+
+    Category prefixes ("Languages: ...") are dropped, items are split on
+    commas, bullets and similar separators, lowercased and mapped through
+    common aliases ("JS" -> "javascript").
+
+    Args:
+        skills_text (str): The text of a skills section.
+
+    Returns:
+        frozenset: The normalized skill names.
+    """
+    skills = set()
+    for line in skills_text.splitlines():
+        if ":" in line:
+            line = line.split(":", 1)[1]
+        for item in _SKILL_SPLIT_RE.split(line):
+            item = " ".join(item.strip(" -*.()").lower().split())
+            # Long fragments are sentences, not skill names.
+            if item and len(item.split()) <= 4:
+                skills.add(_SKILL_ALIASES.get(item, item))
+    return frozenset(skills)
+
+
+def _split_sections(pdf_bytes):
+    with _open_pdf(pdf_bytes) as doc:
+        lines = list(_iter_styled_lines(doc))
+
+    body_size = _body_font_size(lines)
+    styled = any(_emphasized(line, body_size) for line in lines)
+    sections = {name: [] for name in ("header",) + SECTION_NAMES}
+    current = "header"
+    for line in lines:
+        section = _classify_heading(line, body_size, styled)
+        # The name at the top is usually the largest text on the page; only
+        # known headings may end the header.
+        if section == "other" and current == "header":
+            section = None
+        if section is not None:
+            current = section
+            if section == "other":
+                sections["other"].append(line.text)
+            continue
+        sections[current].append(line.text)
+
+    texts = {name: "\n".join(body) for name, body in sections.items()}
+    return ResumeSections(skills_set=normalize_skills(texts["skills"]), **texts)
+
+
+@timed("resume_parser.parse_resume_sections")
+def parse_resume_sections(file):
+    """
+    Splits a PDF resume into sections using PyMuPDF font information.
+
+    Headings are recognized by their wording together with their font size,
+    weight or capitalization, so the parse is local and deterministic.
+    Results share the parse cache, keyed by a hash of the PDF bytes.
+
+    Args:
+        file (UploadedFile): The PDF file uploaded via Streamlit.
+
+    Returns:
+        ResumeSections: The text of each section and the normalized skills set.
+    """
+    file.seek(0)
+    pdf_bytes = file.read()
+
+    key = f"{_pdf_digest(pdf_bytes)}-sections"
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    sections = _split_sections(pdf_bytes)
+    _cache_put(key, sections)
+    return sections
+
+
+def sections_text(sections, names=None):
+    """
+    Renders selected sections back into headed plain text for a prompt.
+
+    Args:
+        sections (ResumeSections): A parsed resume.
+        names (tuple, optional): Section names to include, in SECTION_NAMES
+            order. Defaults to every section. The header is always included.
+
+    Returns:
+        str: The header followed by each non-empty selected section.
+    """
+    names = SECTION_NAMES if names is None else names
+    blocks = [sections.header] if sections.header else []
+    for name in SECTION_NAMES:
+        body = getattr(sections, name)
+        if name in names and body:
+            blocks.append(f"{name.title()}\n{body}")
+    return "\n\n".join(blocks)
@@ -0,0 +1,267 @@
+"""
+Headless HTTP API over ai_module and resume_parser.
+
+A plain ASGI application with no web framework dependency; serve it with any
+ASGI server, for example:
+
+    GEMINI_API_KEY=... uvicorn service:app --workers 4
+
+Endpoints (all POST, JSON in and out unless noted):
+    /analyze-resume  A PDF body (Content-Type: application/pdf) or {"resume_text": ...}
+    /mock-interview  {"topic": ...}
+    /trends          {"interest_area": ...}
+    /caption         An image body (Content-Type: image/*) or {"image_base64": ..., "prompt": ...}
+    /plan            {"project_idea": ...}
+    /healthz         GET; cache, rate limiter and resilience counters
+    /metrics         GET; latency percentiles and counters in the Prometheus text format
+
+Each worker process keeps one model, HTTP client and set of caches for its
+lifetime, shared by all requests it serves.
+"""
+import asyncio
+import base64
+import binascii
+import io
+import json
+import os
+import google.api_core.exceptions
+import ai_module
+from metrics import get_metrics
+from model_backends import get_backend, get_model_registry
+from rate_limiter import RateLimitTimeout, get_rate_limiter
+from resilience import CircuitOpenError
+from resume_parser import extract_resume_content, parse_resume_sections
+
+# Largest request body accepted, in bytes.
+MAX_BODY_BYTES = int(os.getenv("CAREERCRAFT_MAX_BODY_BYTES", str(10 * 1024 * 1024)))
+
+
+class HTTPError(Exception):
+    """An error response with a status code and a message for the client."""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or []
+
+
+class ClientDisconnected(Exception):
+    """The client went away before sending the whole request body."""
+
+
+class Request:
+    """The parts of an ASGI HTTP request the handlers need."""
+
+    def __init__(self, scope, body):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.headers = {
+            name.decode("latin-1").lower(): value.decode("latin-1")
+            for name, value in scope.get("headers", [])
+        }
+        self.body = body
+
+    @property
+    def content_type(self):
+        return self.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    def json(self):
+        try:
+            payload = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Request body must be valid JSON.")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Request body must be a JSON object.")
+        return payload
+
+    def field(self, name):
+        """Returns a required, non-empty string field from the JSON body."""
+        value = self.json().get(name)
+        if not isinstance(value, str) or not value.strip():
+            raise HTTPError(400, f'"{name}" is required.')
+        return value
+
+
+_model = None
+
+
+def get_model():
+    """Returns the worker's model, set up at startup."""
+    if _model is None:
+        raise HTTPError(503, "The model is not configured. Set GEMINI_API_KEY.")
+    return _model
+
+
+# --- Handlers ---
+
+async def analyze_resume(request):
+    if request.content_type == "application/pdf":
+        import fitz  # PyMuPDF; already loaded by the parser on a warm server
+
+        pdf = io.BytesIO(request.body)
+        try:
+            # Parsing is CPU-bound; keep it off the event loop.
+            resume_text, _ = await asyncio.to_thread(extract_resume_content, pdf)
+            sections = await asyncio.to_thread(parse_resume_sections, pdf)
+        except fitz.FileDataError:  # also covers EmptyFileError
+            raise HTTPError(400, "The request body is not a readable PDF.")
+        skills = sorted(sections.skills_set)
+    else:
+        resume_text = request.field("resume_text")
+        skills = None
+    analysis = await ai_module.analyze_resume_async(get_model(), resume_text)
+    matches = await asyncio.to_thread(ai_module.match_job_descriptions, resume_text)
+    return {
+        "analysis": analysis._asdict(),
+        "skills": skills,
+        "similar_jobs": [match._asdict() for match in matches],
+    }
+
+
+async def mock_interview(request):
+    text = await ai_module.mock_interview_async(get_model(), request.field("topic"))
+    return {"text": text}
+
+
+async def trends(request):
+    text = await ai_module.get_trends_and_courses_async(get_model(), request.field("interest_area"))
+    return {"text": text}
+
+
+async def caption(request):
+    if request.content_type.startswith("image/"):
+        image_bytes, prompt = request.body, None
+    else:
+        payload = request.json()
+        try:
+            image_bytes = base64.b64decode(payload.get("image_base64") or "", validate=True)
+        except (binascii.Error, TypeError):
+            raise HTTPError(400, '"image_base64" must be base64-encoded image data.')
+        prompt = payload.get("prompt")
+    if not image_bytes:
+        raise HTTPError(400, "An image is required.")
+    from PIL import UnidentifiedImageError
+
+    kwargs = {"prompt": prompt} if prompt else {}
+    try:
+        text = await ai_module.create_image_caption_async(get_model(), image_bytes, **kwargs)
+    except UnidentifiedImageError:
+        raise HTTPError(400, "The image is not in a supported format.")
+    return {"text": text}
+
+
+async def plan(request):
+    text = await ai_module.plan_sdlc_project_async(get_model(), request.field("project_idea"))
+    return {"text": text}
+
+
+async def healthz(request):
+    return {
+        "model_configured": _model is not None,
+        "models": get_model_registry().loaded(),
+        "response_cache": ai_module.get_response_cache_stats(),
+        "single_flight": ai_module.get_single_flight_stats(),
+        "resilience": ai_module.get_resilience_stats(),
+        "rate_limiter": get_rate_limiter().stats(),
+    }
+
+
+async def metrics(request):
+    return get_metrics().render_prometheus()
+
+
+ROUTES = {
+    ("POST", "/analyze-resume"): analyze_resume,
+    ("POST", "/mock-interview"): mock_interview,
+    ("POST", "/trends"): trends,
+    ("POST", "/caption"): caption,
+    ("POST", "/plan"): plan,
+    ("GET", "/healthz"): healthz,
+    ("GET", "/metrics"): metrics,
+}
+
+
+# --- ASGI Plumbing ---
+
+async def _read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ClientDisconnected()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise HTTPError(413, f"Request body exceeds {MAX_BODY_BYTES} bytes.")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _send(send, status, payload, headers=()):
+    """Sends a dict as JSON, or a str as plain text (e.g. /metrics)."""
+    if isinstance(payload, str):
+        body, content_type = payload.encode("utf-8"), b"text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body, content_type = json.dumps(payload).encode("utf-8"), b"application/json"
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", content_type),
+            (b"content-length", str(len(body)).encode("ascii")),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _dispatch(scope, receive):
+    """Runs the matching handler and returns (status, payload, headers)."""
+    handler = ROUTES.get((scope["method"], scope["path"]))
+    if handler is None:
+        if any(path == scope["path"] for _, path in ROUTES):
+            raise HTTPError(405, "Method not allowed.")
+        raise HTTPError(404, "Not found.")
+    request = Request(scope, await _read_body(receive))
+    return 200, await handler(request), []
+
+
+async def _lifespan(receive, send):
+    global _model
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            api_key = os.getenv("GEMINI_API_KEY")
+            if api_key or not get_backend().requires_api_key:
+                _model = ai_module.setup_model(api_key)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """The ASGI entry point."""
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    headers = []
+    try:
+        status, payload, headers = await _dispatch(scope, receive)
+    except HTTPError as e:
+        status, payload, headers = e.status, {"error": e.message}, e.headers
+    except CircuitOpenError as e:
+        status, payload = 503, {"error": str(e)}
+        headers = [(b"retry-after", str(int(e.retry_after) + 1).encode("ascii"))]
+    except (RateLimitTimeout, google.api_core.exceptions.ResourceExhausted):
+        status, payload = 429, {"error": "The service is busy right now. Please try again in a minute."}
+    except ClientDisconnected:
+        return
+    except Exception as e:
+        status, payload = 500, {"error": f"An unexpected error occurred: {e}"}
+    await _send(send, status, payload, headers)
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class FlightAbandoned(Exception):
+    """Raised to waiting callers when the leader stopped before finishing."""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight call.
+
+    The first caller for a key (the leader) does the work; callers arriving
+    while it runs wait on the same future and receive its result or its
+    exception. Once the call finishes the key is forgotten, so later calls
+    are served by the response cache rather than by this class.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {"leaders": 0, "shared": 0}
+
+    def begin(self, key):
+        """
+        Joins or starts the flight for key.
+
+        Returns:
+            tuple: The flight's Future and True if the caller is the leader.
+                A leader must call finish() or fail() when done.
+        """
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self._stats["shared"] += 1
+                return future, False
+            future = Future()
+            self._flights[key] = future
+            self._stats["leaders"] += 1
+            return future, True
+
+    def finish(self, key, result):
+        """Publishes the leader's result to every waiting caller."""
+        with self._lock:
+            future = self._flights.pop(key)
+        future.set_result(result)
+
+    def fail(self, key, exc):
+        """Publishes the leader's exception to every waiting caller."""
+        with self._lock:
+            future = self._flights.pop(key)
+        future.set_exception(exc)
+
+    def do(self, key, func, *args, **kwargs):
+        """Calls func once per concurrent key and shares its result."""
+        future, leader = self.begin(key)
+        if not leader:
+            return future.result()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as exc:
+            self.fail(key, exc)
+            raise
+        self.finish(key, result)
+        return result
+
+    async def ado(self, key, func, *args, **kwargs):
+        """Async counterpart of do(); func must return an awaitable."""
+        future, leader = self.begin(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as exc:
+            self.fail(key, exc)
+            raise
+        self.finish(key, result)
+        return result
+
+    def stats(self):
+        """Returns the number of leader calls and of calls that shared a result."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._flights)
+        return stats
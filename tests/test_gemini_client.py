@@ -0,0 +1,72 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from gemini_client import GeminiClient, SlotTimeout
+from resilience import CircuitBreaker, ResilientCaller, RetryPolicy
+
+
+class _Model:
+    def generate_content(self, contents, request_options=None, **kwargs):
+        return "ok"
+
+
+def _client(deadline=0.05):
+    client = GeminiClient(max_concurrency=1)
+    client.resilience = ResilientCaller(
+        RetryPolicy(max_attempts=3, base_delay=0.0, max_delay=0.0, deadline=deadline),
+        CircuitBreaker(failure_threshold=2, reset_timeout=30.0),
+    )
+    return client
+
+
+def test_slot_timeouts_do_not_open_the_circuit():
+    client = _client()
+    client._slots.acquire()
+    for _ in range(5):
+        with pytest.raises(SlotTimeout):
+            client.generate(_Model(), "prompt")
+    client._slots.release()
+
+    assert client.generate(_Model(), "prompt") == "ok"
+    assert client.resilience.stats()["circuit_opened"] == 0
+
+
+def test_async_slot_waits_do_not_hold_executor_threads():
+    client = GeminiClient(max_concurrency=1)
+    client._slots.acquire()
+    order = []
+
+    async def waiter(name):
+        await client._acquire_async(time.monotonic() + 5)
+        order.append(name)
+        client._slots.release()
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(1))
+        tasks = [asyncio.create_task(waiter(i)) for i in range(5)]
+        await asyncio.sleep(0.02)
+        # The executor's only thread is still free for other work.
+        assert await asyncio.wait_for(asyncio.to_thread(lambda: "free"), 1) == "free"
+        client._slots.release()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert order == [0, 1, 2, 3, 4]
+
+
+def test_cancelled_async_waiter_leaves_the_queue():
+    client = GeminiClient(max_concurrency=1)
+    client._slots.acquire()
+
+    async def main():
+        task = asyncio.create_task(client._acquire_async(time.monotonic() + 5))
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    client._slots.release()
+    assert client._slots.acquire(blocking=False)
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from rate_limiter import PRIORITY_HIGH, PRIORITY_LOW, MemoryBuckets, RateLimiter, RateLimitTimeout
+
+
+def _drained_limiter(rpm):
+    buckets = MemoryBuckets(rpm, 1_000_000)
+    buckets._levels[0] = 0.0
+    return RateLimiter(buckets)
+
+
+def test_async_waiters_are_served_by_priority_without_worker_threads():
+    limiter = _drained_limiter(rpm=600)  # one admit every 0.1 s
+    admitted = []
+
+    async def request(name, priority):
+        await limiter.aacquire(1, priority, timeout=5)
+        admitted.append(name)
+
+    async def main():
+        # Waiters must not need executor threads to make progress.
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(1))
+        low = [asyncio.create_task(request(f"low{i}", PRIORITY_LOW)) for i in range(4)]
+        await asyncio.sleep(0.02)
+        high = asyncio.create_task(request("high", PRIORITY_HIGH))
+        await asyncio.gather(*low, high)
+
+    asyncio.run(main())
+    assert admitted[0] == "high"
+    assert limiter.stats()["waiting"] == 0
+
+
+def test_async_and_thread_waiters_share_one_queue():
+    limiter = _drained_limiter(rpm=600)
+    admitted = []
+
+    def thread_request():
+        limiter.acquire(1, PRIORITY_LOW, timeout=5)
+        admitted.append("thread")
+
+    async def main():
+        thread = threading.Thread(target=thread_request)
+        thread.start()
+        time.sleep(0.02)
+        await limiter.aacquire(1, PRIORITY_HIGH, timeout=5)
+        admitted.append("async")
+        await asyncio.to_thread(thread.join)
+
+    asyncio.run(main())
+    assert admitted == ["async", "thread"]
+
+
+def test_async_waiter_times_out_and_leaves_the_queue():
+    limiter = _drained_limiter(rpm=1)
+
+    with pytest.raises(RateLimitTimeout):
+        asyncio.run(limiter.aacquire(1, timeout=0.05))
+    stats = limiter.stats()
+    assert stats["timeouts"] == 1
+    assert stats["waiting"] == 0
@@ -0,0 +1,66 @@
+import time
+import google.api_core.exceptions
+import pytest
+from resilience import CircuitBreaker, CircuitOpenError, ResilientCaller, RetryPolicy
+
+
+def _caller(reset_timeout=0.05):
+    policy = RetryPolicy(max_attempts=3, base_delay=0.0, max_delay=0.0, deadline=5.0)
+    return ResilientCaller(policy, CircuitBreaker(failure_threshold=1, reset_timeout=reset_timeout))
+
+
+def _failing(errors):
+    """Returns a function that raises the given errors in turn, then returns "ok"."""
+    errors = list(errors)
+
+    def func(deadline):
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+    return func
+
+
+def _unavailable():
+    return google.api_core.exceptions.ServiceUnavailable("unavailable")
+
+
+def _open_circuit(caller):
+    with pytest.raises(google.api_core.exceptions.ServiceUnavailable):
+        caller.call(_failing([_unavailable()] * 3))
+    with pytest.raises(CircuitOpenError):
+        caller.call(_failing([]))
+
+
+def test_half_open_trial_is_retried_and_closes_the_circuit():
+    caller = _caller()
+    _open_circuit(caller)
+    time.sleep(0.06)
+
+    # A transient error during the trial is retried, not short-circuited.
+    assert caller.call(_failing([_unavailable()])) == "ok"
+    assert caller.call(_failing([])) == "ok"
+    assert caller.stats()["successes"] == 2
+
+
+def test_failed_trial_reopens_the_circuit_until_the_next_cooldown():
+    caller = _caller()
+    _open_circuit(caller)
+    time.sleep(0.06)
+
+    with pytest.raises(google.api_core.exceptions.ServiceUnavailable):
+        caller.call(_failing([_unavailable()] * 3))
+    with pytest.raises(CircuitOpenError):
+        caller.call(_failing([]))
+
+    time.sleep(0.06)
+    assert caller.call(_failing([])) == "ok"
+
+
+def test_non_retryable_error_releases_the_trial():
+    caller = _caller()
+    _open_circuit(caller)
+    time.sleep(0.06)
+
+    with pytest.raises(ValueError):
+        caller.call(_failing([ValueError("bad input")]))
+    assert caller.call(_failing([])) == "ok"
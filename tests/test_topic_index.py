@@ -0,0 +1,20 @@
+from topic_index import TopicIndex
+
+
+def test_near_duplicates_resolve_to_the_first_topic():
+    index = TopicIndex()
+    assert index.resolve("Data structures in Python") == "Data structures in Python"
+    assert index.resolve("python  data structures") == "Data structures in Python"
+    assert index.resolve("Machine learning basics") == "Machine learning basics"
+    assert index.resolve("machine learning basic") == "Machine learning basics"
+    assert index.resolve("Kubernetes networking") == "Kubernetes networking"
+
+
+def test_evicted_topics_leave_no_postings_behind():
+    index = TopicIndex(max_topics=2)
+    for topic in ("alpha beta", "gamma delta", "epsilon zeta"):
+        index.add(topic)
+
+    assert index.lookup("alpha beta") is None
+    assert index.lookup("epsilon zeta") == "epsilon zeta"
+    assert not any(gram in index._postings for gram in (" al", "alp", "bet"))
@@ -0,0 +1,188 @@
+import os
+import re
+import math
+import itertools
+import threading
+from collections import Counter
+
+# Cosine similarity above which two topics are treated as the same question.
+TOPIC_SIMILARITY_THRESHOLD = float(os.getenv("CAREERCRAFT_TOPIC_SIMILARITY", "0.85"))
+TOPIC_INDEX_MAX_TOPICS = 2000
+NGRAM_SIZE = 3
+# Topic norms are recomputed once this share of the index (and at least
+# NORM_REFRESH_MIN topics) has been added or evicted since the last refresh;
+# in between, new topics are normed under the IDF weights of their arrival.
+NORM_REFRESH_FRACTION = 0.05
+NORM_REFRESH_MIN = 8
+
+# Filler words that change the wording of a topic but not what is being asked.
+_STOPWORDS = frozenset(
+    "a an and about for in into of on the to with using".split()
+)
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def normalize_topic(topic):
+    """
+    Normalizes a free-text topic for matching.
+
+    Lowercases, drops punctuation and filler words, and sorts the remaining
+    words, so "Data structures in Python" and "python  data structures"
+    normalize to the same string.
+
+    Args:
+        topic (str): The user's topic.
+
+    Returns:
+        str: The normalized topic.
+    """
+    words = [word for word in _WORD_RE.findall(topic.lower()) if word not in _STOPWORDS]
+    return " ".join(sorted(words))
+
+
+def _ngrams(normalized):
+    padded = f" {normalized} "
+    return Counter(padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1))
+
+
+class TopicIndex:
+    """
+    Maps new topics onto previously seen ones by character n-gram TF-IDF similarity.
+
+    Topics are stored as sparse n-gram rows in an inverted index, so adding
+    one only touches its own n-grams. IDF weights are always current; the
+    per-topic norms they feed into are refreshed in batches as topics come
+    and go (see NORM_REFRESH_FRACTION).
+
+    Args:
+        threshold (float): Minimum cosine similarity for a match.
+        max_topics (int): Oldest topics are forgotten beyond this many.
+    """
+
+    def __init__(self, threshold=TOPIC_SIMILARITY_THRESHOLD, max_topics=TOPIC_INDEX_MAX_TOPICS):
+        self.threshold = threshold
+        self.max_topics = max_topics
+        self._rows = {}            # row id -> (canonical topic, n-gram Counter), oldest first
+        self._normalized = {}      # normalized topic -> canonical topic
+        self._postings = {}        # n-gram -> {row id: count}
+        self._norms = {}           # row id -> TF-IDF norm, as of its last refresh
+        self._row_ids = itertools.count()
+        self._changes_since_refresh = 0
+        self._lock = threading.Lock()
+
+    def _idf(self, doc_freq):
+        return math.log((1 + len(self._rows)) / (1 + doc_freq)) + 1.0
+
+    def _norm(self, counts):
+        return math.sqrt(sum(
+            (count * self._idf(len(self._postings.get(gram, ())))) ** 2 for gram, count in counts.items()
+        ))
+
+    def _refresh_norms(self):
+        """Recomputes every row's norm under the current IDF weights."""
+        squared_idf = {gram: self._idf(len(postings)) ** 2 for gram, postings in self._postings.items()}
+        self._norms = {
+            row_id: math.sqrt(sum(count * count * squared_idf[gram] for gram, count in counts.items()))
+            for row_id, (_, counts) in self._rows.items()
+        }
+        self._changes_since_refresh = 0
+
+    def _scores(self, normalized):
+        """Returns {row id: cosine similarity} for rows sharing an n-gram with the query."""
+        dots = {}
+        query_norm = 0.0
+        # Unknown n-grams still count towards the query's length, weighted like
+        # the rarest known n-gram, so a query that merely contains a known
+        # topic is not scored as a perfect match.
+        rarest = self._idf(1)
+        for gram, count in _ngrams(normalized).items():
+            postings = self._postings.get(gram)
+            if not postings:
+                query_norm += (count * rarest) ** 2
+                continue
+            weight = self._idf(len(postings))
+            query_norm += (count * weight) ** 2
+            for row_id, row_count in postings.items():
+                dots[row_id] = dots.get(row_id, 0.0) + count * row_count * weight * weight
+        query_norm = max(math.sqrt(query_norm), 1e-12)
+        return {row_id: dot / (query_norm * max(self._norms[row_id], 1e-12)) for row_id, dot in dots.items()}
+
+    def lookup(self, topic):
+        """
+        Finds the previously seen topic most similar to this one.
+
+        Args:
+            topic (str): The user's topic.
+
+        Returns:
+            str | None: The matching canonical topic, or None if nothing is
+                similar enough.
+        """
+        normalized = normalize_topic(topic)
+        if not normalized:
+            return None
+        with self._lock:
+            if normalized in self._normalized:
+                return self._normalized[normalized]
+            if not self._rows:
+                return None
+            if self._changes_since_refresh > max(NORM_REFRESH_MIN, NORM_REFRESH_FRACTION * len(self._rows)):
+                self._refresh_norms()
+            scores = self._scores(normalized)
+            if not scores:
+                return None
+            best = max(scores, key=scores.get)
+            if scores[best] >= self.threshold:
+                return self._rows[best][0]
+            return None
+
+    def add(self, topic):
+        """Records a topic as canonical for itself and its near duplicates."""
+        normalized = normalize_topic(topic)
+        if not normalized:
+            return
+        with self._lock:
+            if normalized in self._normalized:
+                return
+            row_id = next(self._row_ids)
+            counts = _ngrams(normalized)
+            self._rows[row_id] = (topic, counts)
+            self._normalized[normalized] = topic
+            for gram, count in counts.items():
+                self._postings.setdefault(gram, {})[row_id] = count
+            self._norms[row_id] = self._norm(counts)
+            self._changes_since_refresh += 1
+            if len(self._rows) > self.max_topics:
+                self._evict_oldest()
+
+    def _evict_oldest(self):
+        row_id = next(iter(self._rows))
+        oldest, counts = self._rows.pop(row_id)
+        del self._norms[row_id]
+        self._normalized.pop(normalize_topic(oldest), None)
+        for gram in counts:
+            postings = self._postings[gram]
+            del postings[row_id]
+            if not postings:
+                del self._postings[gram]
+        self._changes_since_refresh += 1
+
+    def resolve(self, topic):
+        """
+        Returns the canonical topic to use for a request.
+
+        A near duplicate of a known topic resolves to that topic, so its
+        prompt, and therefore its cached answer, is reused. Anything else
+        becomes a new canonical topic.
+
+        Args:
+            topic (str): The user's topic.
+
+        Returns:
+            str: The canonical topic.
+        """
+        match = self.lookup(topic)
+        if match is not None:
+            return match
+        self.add(topic)
+        return topic
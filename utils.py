@@ -1,6 +1,224 @@
-def is_safe(text):
-    banned_words = ["hate", "violence"]
-    for word in banned_words:
-        if word in text.lower():
+import os
+import re
+import threading
+
+# --- Safety Settings ---
+# Blocklist file with one word or phrase per line ("#" starts a comment);
+# leave unset to use DEFAULT_BANNED_WORDS.
+BLOCKLIST_PATH = os.getenv("CAREERCRAFT_BLOCKLIST")
+DEFAULT_BANNED_WORDS = ("hate", "violence")
+
+
+def load_blocklist(path=None):
+    """
+    Reads banned words and phrases from a file.
+
+    Args:
+        path (str, optional): The blocklist file. Defaults to BLOCKLIST_PATH.
+
+    Returns:
+        list: The entries, or DEFAULT_BANNED_WORDS if no file is configured.
+    """
+    path = path or BLOCKLIST_PATH
+    if not path:
+        return list(DEFAULT_BANNED_WORDS)
+    with open(path, encoding="utf-8") as f:
+        entries = (line.split("#", 1)[0].strip() for line in f)
+        return [entry for entry in entries if entry]
+
+
+def _trie_pattern(words):
+    """
+    Builds a regex alternation shaped like a prefix trie.
+
+    Words sharing a prefix share one branch ("hate", "hatred" -> "hat(?:e|red)"),
+    so the regex engine tries each character at most once per position
+    instead of once per word.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{pattern})?" if "" in node else pattern
+
+    return build(trie)
+
+
+def _is_word_char(char):
+    """Mirrors the regex "\\w" class."""
+    return char.isalnum() or char == "_"
+
+
+class SafetyFilter:
+    """
+    Finds banned words and phrases in text, in a single pass.
+
+    Entries match case-insensitively and only as whole words, so "hate"
+    matches "Hate!" but not "chatter" or "whatever".
+
+    Args:
+        words (iterable): Banned words and phrases.
+    """
+
+    def __init__(self, words):
+        words = sorted({word.strip().lower() for word in words if word.strip()})
+        self.words = tuple(words)
+        self._pattern = None
+        if words:
+            # Text is lowercased once instead of using re.IGNORECASE, and the
+            # pattern starts with the trie rather than a lookbehind, so the
+            # regex engine can skip ahead to positions holding a first letter.
+            self._pattern = re.compile(rf"{_trie_pattern(words)}(?!\w)")
+        # Longest entry: how much text a streaming scan must carry between chunks.
+        self.max_length = max((len(word) for word in words), default=0)
+
+    def _search(self, lowered, pos=0):
+        """Returns the first whole-word match in already lowercased text, or None."""
+        if self._pattern is None:
+            return None
+        match = self._pattern.search(lowered, pos)
+        # The left word boundary is checked here; see __init__.
+        while match is not None and match.start() > 0 and _is_word_char(lowered[match.start() - 1]):
+            match = self._pattern.search(lowered, match.start() + 1)
+        return match
+
+    def find(self, text):
+        """Returns the first banned-word match in text, or None."""
+        return self._search(text.lower())
+
+    def is_safe(self, text):
+        """Returns True if text contains no banned word or phrase."""
+        return self.find(text) is None
+
+    def scanner(self):
+        """Returns a StreamScanner for checking a response as it streams."""
+        return StreamScanner(self)
+
+
+class StreamScanner:
+    """
+    Checks streamed text chunk by chunk without rescanning what came before.
+
+    Only the last few characters of earlier chunks are kept, enough to catch a
+    banned phrase split across chunks. A match that touches the end of the
+    text so far is not reported until the next chunk (or finish()) shows
+    that the word really ends there.
+    """
+
+    def __init__(self, safety_filter):
+        self._filter = safety_filter
+        self._tail = ""
+        # Chars at the start of _tail kept only as left context for "\w" checks.
+        self._context = 0
+        self.match = None
+
+    @property
+    def safe(self):
+        return self.match is None
+
+    def feed(self, chunk):
+        """
+        Scans the next chunk.
+
+        Returns:
+            bool: False once a banned word has been found.
+        """
+        if self.match is not None:
+            return False
+        window = self._tail + chunk.lower()
+        match = self._filter._search(window, self._context)
+        while match is not None and match.end() == len(window):
+            # Possibly the start of a longer word; decide when more text arrives.
+            match = self._filter._search(window, match.start() + 1)
+        if match is not None:
+            self.match = match.group(0)
             return False
-    return True
\ No newline at end of file
+
+        keep = self._filter.max_length + 1
+        self._tail = window[-keep:]
+        self._context = 1 if len(window) > self._filter.max_length else 0
+        return True
+
+    def finish(self):
+        """Checks the end of the stream; returns True if the whole text was safe."""
+        if self.match is None:
+            match = self._filter._search(self._tail, self._context)
+            if match is not None:
+                self.match = match.group(0)
+        return self.match is None
+
+
+class UnsafeContentError(Exception):
+    """Raised by checked_stream() when streamed text contains a banned word."""
+
+    def __init__(self, match):
+        self.match = match
+        super().__init__("Inappropriate content detected in the response.")
+
+
+_safety_filter = None
+_safety_filter_lock = threading.Lock()
+
+
+def get_safety_filter():
+    """Returns the process-wide safety filter, compiled once from the blocklist."""
+    global _safety_filter
+    with _safety_filter_lock:
+        if _safety_filter is None:
+            _safety_filter = SafetyFilter(load_blocklist())
+        return _safety_filter
+
+
+def set_safety_filter(safety_filter):
+    """Replaces the process-wide safety filter, e.g. after editing the blocklist."""
+    global _safety_filter
+    with _safety_filter_lock:
+        _safety_filter = safety_filter
+
+
+def is_safe(text):
+    """
+    Checks a response against the blocklist.
+
+    Args:
+        text (str): The text to check.
+
+    Returns:
+        bool: True if the text contains no banned word or phrase.
+    """
+    return get_safety_filter().is_safe(text)
+
+
+def checked_stream(chunks):
+    """
+    Yields text chunks only once they have passed the safety filter.
+
+    Each chunk is held back until the next one has been scanned, since a
+    banned word can end in the following chunk.
+
+    Args:
+        chunks (iterable): Streamed text chunks.
+
+    Raises:
+        UnsafeContentError: At the first banned word; no later text is yielded.
+    """
+    scanner = get_safety_filter().scanner()
+    pending = None
+    for chunk in chunks:
+        if not scanner.feed(chunk):
+            raise UnsafeContentError(scanner.match)
+        if pending is not None:
+            yield pending
+        pending = chunk
+    if not scanner.finish():
+        raise UnsafeContentError(scanner.match)
+    if pending is not None:
+        yield pending